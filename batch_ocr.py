@@ -0,0 +1,208 @@
+"""
+Headless OCR of screenshots and recorded video, without the overlay or hotkeys.
+
+    py batch_ocr.py screenshots/                      # every image in a folder
+    py batch_ocr.py session.mp4 --every 0.5           # a frame every 0.5s, skipping unchanged scenes
+    py batch_ocr.py session.mp4 --bbox 825 1077 1793 269 --strict
+
+Images are OCR'd on a pool of worker processes, each with its own EasyOCR reader. Every image or
+frame becomes one JSON line in --output with its OCR lines, their bboxes and the vocab matched in
+them. A word-frequency list of all matched vocab (with pinyin and definitions) is written to --report
+as tab-separated values, ready to import as a study list.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from multiprocessing import Pool
+
+import numpy as np
+from PIL import Image
+
+import script
+from utils.cpu_inference import configure_threads, cpu_reader_kwargs
+from utils.ocr_reader import BackgroundReader
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.avi', '.mov', '.webm', '.flv')
+
+
+def iter_images(path: str):
+    """
+    Yield (source, frame, seconds, None) for an image file or every image in a folder.
+    The worker loads the image itself, so only the path crosses the process boundary.
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(path, name), 0, None, None
+    else:
+        yield path, 0, None, None
+
+
+def iter_video_frames(path: str, every=1.0, scene_threshold=4.0):
+    """
+    Yield (source, frame, seconds, RGB array) for a frame every `every` seconds of the video,
+    skipping frames that look the same as the last one yielded.
+
+    Frames are compared as small grayscale thumbnails; a frame is skipped if the mean absolute
+    difference is below scene_threshold (0-255).
+    """
+    import cv2
+
+    video = cv2.VideoCapture(path)
+    if not video.isOpened():
+        print(f"Could not open video {path}")
+        return
+    fps = video.get(cv2.CAP_PROP_FPS) or 30
+    step = max(1, round(every * fps))
+
+    last_thumbnail = None
+    index = 0
+    try:
+        while video.grab(): # grab() without decoding the frames in between samples
+            if index % step == 0:
+                ok, frame = video.retrieve()
+                if not ok:
+                    break
+                thumbnail = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (64, 36), interpolation=cv2.INTER_AREA).astype(np.int16)
+                if last_thumbnail is None or np.abs(thumbnail - last_thumbnail).mean() >= scene_threshold:
+                    last_thumbnail = thumbnail
+                    yield path, index, index / fps, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            index += 1
+    finally:
+        video.release()
+
+
+def iter_inputs(paths: list, every: float, scene_threshold: float):
+    for path in paths:
+        if path.lower().endswith(VIDEO_EXTENSIONS):
+            yield from iter_video_frames(path, every, scene_threshold)
+        else:
+            yield from iter_images(path)
+
+
+_bbox = None # area of each image to OCR, set per worker
+_load_error = None # why this worker's reader failed to load
+
+
+def init_worker(gpu: bool, threads: int, strict: bool, bbox):
+    """
+    Load this worker's own reader once, before it takes any work.
+
+    A load error is kept and raised from ocr_item: an initializer that raises makes the Pool
+    respawn workers forever.
+    """
+    global _bbox, _load_error
+    _bbox = bbox
+    script.CONFIG['verbose'] = False
+    script.CONFIG['preprocess_image'] = strict
+    # the thread budget is split between workers here, so only take the int8 setting from cpu_inference
+    settings = {**script.CONFIG['cpu_inference'], 'intra_op_threads': 0, 'inter_op_threads': 0}
+    script.READER = BackgroundReader(['ch_sim'], gpu=gpu, **cpu_reader_kwargs(**settings))
+    try:
+        if threads:
+            configure_threads(threads)
+        script.READER.get()
+    except Exception as e:
+        e = e.__cause__ or e # BackgroundReader wraps the original error
+        _load_error = f"{type(e).__name__}: {e}"
+
+
+def ocr_item(item) -> dict:
+    if _load_error:
+        raise RuntimeError(f"OCR model failed to load in a worker ({_load_error})")
+    source, frame, seconds, image = item
+    if image is None:
+        image = np.asarray(Image.open(source).convert('RGB'))
+    if _bbox:
+        x, y, width, height = _bbox
+        image = image[y:y + height, x:x + width]
+
+    img_to_ocr = script.strict_preprocess_image(image) if script.CONFIG['preprocess_image'] else image
+    lines = []
+    for bbox, text, confidence in script.perform_ocr_tiled(img_to_ocr):
+        vocab = script.segment_vocab([(bbox, text, confidence)])
+        lines.append({
+            'text': text,
+            'bbox': [int(v) for v in bbox],
+            'confidence': round(float(confidence), 4),
+            'vocab': [{'word': word, 'bbox': word_bbox} for word, word_bbox in vocab],
+        })
+    return {'source': source, 'frame': frame, 'seconds': seconds, 'lines': lines}
+
+
+def write_report(path: str, counts: Counter, min_count=1):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write("word\tcount\tpinyin\tenglish\n")
+        for word, count in counts.most_common():
+            if count < min_count:
+                break
+            entries = script.DICTIONARY.get(word, [])
+            pinyin = ' / '.join(dict.fromkeys(pinyin for _, pinyin, _ in entries))
+            english = ' | '.join(english for _, _, english in entries)
+            file.write(f"{word}\t{count}\t{pinyin}\t{english}\n")
+
+
+def run(args) -> int:
+    workers = args.workers or os.cpu_count() or 1
+    threads = args.threads if args.threads is not None else max(1, (os.cpu_count() or 1) // workers)
+    strict = script.CONFIG['preprocess_image'] if args.strict is None else args.strict
+    report_path = args.report or os.path.splitext(args.output)[0] + '.freq.tsv'
+
+    counts = Counter()
+    records = 0
+    start = time.perf_counter()
+    with Pool(workers, initializer=init_worker, initargs=(args.gpu, threads, strict, args.bbox)) as pool, \
+            open(args.output, 'w', encoding='utf-8') as output:
+        # keep a bounded number of items in flight, so a long video is never decoded far ahead of the OCR
+        in_flight = deque()
+
+        def drain(limit):
+            nonlocal records
+            while len(in_flight) > limit:
+                record = in_flight.popleft().get()
+                output.write(json.dumps(record, ensure_ascii=False) + '\n')
+                output.flush()
+                counts.update(vocab['word'] for line in record['lines'] for vocab in line['vocab'])
+                records += 1
+                if records % 50 == 0:
+                    print(f"{records} images OCR'd . . .")
+
+        try:
+            for item in iter_inputs(args.inputs, args.every, args.scene_threshold):
+                in_flight.append(pool.apply_async(ocr_item, (item,)))
+                drain(2 * workers)
+            drain(0)
+        except RuntimeError as e:
+            print(e)
+            return 1
+
+    write_report(report_path, counts, args.min_count)
+    print(f"Done! {records} images in {time.perf_counter() - start:.1f}s on {workers} workers, "
+          f"{len(counts)} distinct words. Wrote {args.output} and {report_path}")
+    return 0 if records else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='+', help="image files, folders of images, or video files")
+    parser.add_argument('-o', '--output', default='batch_ocr.jsonl')
+    parser.add_argument('--report', help="word-frequency TSV (default: next to --output)")
+    parser.add_argument('--min-count', type=int, default=1, help="leave words seen fewer times out of the report")
+    parser.add_argument('--workers', type=int, default=None, help="OCR processes (default: one per core)")
+    parser.add_argument('--threads', type=int, default=None, help="torch threads per worker (default: cores / workers)")
+    parser.add_argument('--gpu', action='store_true', help="run the model on GPU if available")
+    parser.add_argument('--strict', dest='strict', action='store_true', default=None, help="filter text colors first (default: preprocess_image in config.json)")
+    parser.add_argument('--no-strict', dest='strict', action='store_false')
+    parser.add_argument('--bbox', type=int, nargs=4, metavar=('X', 'Y', 'WIDTH', 'HEIGHT'), help="only OCR this area of each image")
+    parser.add_argument('--every', type=float, default=1.0, help="seconds between sampled video frames")
+    parser.add_argument('--scene-threshold', type=float, default=4.0, help="min mean pixel change (0-255) for a video frame to count as new")
+    args = parser.parse_args(argv)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,559 @@
+"""
+Offline benchmarks for the OCR pipeline. Runs headless, without the overlay or hotkeys.
+
+    py benchmark.py replay saved_data               # replay captures saved with save_data on
+    py benchmark.py replay --synthetic 50           # render dictionary text into synthetic captures
+    py benchmark.py replay saved_data --stub-ocr    # skip the model, time only the other stages
+    py benchmark.py replay saved_data --save-baseline
+    py benchmark.py replay saved_data --baseline benchmark_baseline.json
+    py benchmark.py quantize --synthetic 50         # int8 vs float recognizer on CPU
+    py benchmark.py autotune --save                 # pick adaptive_scaling.target_text_height
+    py benchmark.py soak --captures 5000            # check a long session for leaks
+
+Each stage reports throughput and latency percentiles. With --baseline, the run fails (exit code 1)
+if any stage's median latency regressed by more than --tolerance.
+
+quantize runs the same captures through the float and the int8 recognizer and reports recognition
+latency and the character error rate of each, failing if the int8 text differs from the float text
+by more than --max-cer.
+
+autotune OCRs fullscreen-sized captures at each --targets text height (and unscaled) and reports
+OCR latency and character error rate, recommending the fastest setting within --max-cer-increase
+of the most accurate one.
+
+soak drives synthetic captures through capture OCR, card rendering, hovering and adding to Anki
+(stub OCR, headless rendering unless --tk) and samples RSS, the number of live Python objects and
+the overlay's window/widget/callback counts, failing if they keep growing after a warm-up.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import yaml
+from PIL import Image, ImageDraw, ImageFont
+
+import script
+from utils.cpu_inference import configure_threads
+from utils.ocr_reader import BackgroundReader
+from utils.ocr_store import query_captures
+from utils.render_backend import RecordingBackend, TkBackend
+from utils.vocab import CardPool
+
+CJK_FONTS = [
+    'C:/Windows/Fonts/msyh.ttc',
+    'C:/Windows/Fonts/simhei.ttf',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc',
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+    '/System/Library/Fonts/PingFang.ttc',
+]
+
+
+class StubReader:
+    """
+    Stands in for easyocr.Reader: detect/recognize return the results queued for the next capture.
+    """
+    device = 'stub'
+
+    def __init__(self):
+        self.next_results = []
+
+    def detect(self, image, **kwargs):
+        # easyocr returns [x_min, x_max, y_min, y_max] boxes per image
+        return [[[x1, x2, y1, y2] for (x1, y1, x2, y2), _, _ in self.next_results]], [[]]
+
+    def recognize(self, img_cv_grey, horizontal_list=None, free_list=None, **kwargs):
+        # easyocr returns four corner points per box
+        return [([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], text, confidence)
+                for (x1, y1, x2, y2), text, confidence in self.next_results]
+
+
+class StubAnki:
+    """
+    Stands in for AnkiClient without AnkiConnect: no words are known and added notes are only counted.
+    """
+    known_words = 'dim'
+
+    def __init__(self):
+        self.added = 0
+
+    def is_known(self, word: str) -> bool:
+        return False
+
+    def add(self, entry: dict):
+        self.added += 1
+
+
+class StubLoader:
+    is_ready = True
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def get(self, timeout=None):
+        return self.reader
+
+
+def load_saved_captures(save_dir: str) -> list[tuple[np.ndarray, list]]:
+    """
+    Load (image, recorded results) pairs from a directory written by OCRStore
+    (or the ocr_data.yaml layout of older versions). Returns [] if there is neither.
+    """
+    records = query_captures(save_dir)
+    if records:
+        return [(np.asarray(Image.open(record['image_path']).convert('RGB')),
+                 [(r['bbox'], r['text'], r['confidence']) for r in record['results']])
+                for record in reversed(records) if record['image_path'] and os.path.exists(record['image_path'])]
+
+    yaml_path = os.path.join(save_dir, 'ocr_data.yaml')
+    if not os.path.exists(yaml_path):
+        print(f"No saved captures in {save_dir}: expected ocr_data.sqlite or ocr_data.yaml, written while save_data is on")
+        return []
+    with open(yaml_path, 'r', encoding='utf-8') as file:
+        records = yaml.safe_load(file) or []
+
+    captures = []
+    for record in records:
+        image_path = os.path.join(save_dir, 'images', f"{record['image_id']}.png")
+        if not os.path.exists(image_path):
+            continue
+        results = [(r['bbox'], r['text'], r['confidence']) for r in record['results']]
+        captures.append((np.asarray(Image.open(image_path).convert('RGB')), results))
+    return captures
+
+
+def render_synthetic_captures(count: int, font_path=None, seed=0, size=(1800, 270), font_size=36) -> list[tuple[np.ndarray, list]]:
+    """
+    Render random dictionary words in the configured text colors onto dark images
+    (dialog-sized by default).
+    """
+    rng = random.Random(seed)
+    words = [word for word, _ in zip(script.DICTIONARY, range(20000)) if 1 < len(word) <= 4]
+    font_path = font_path or next((path for path in CJK_FONTS if os.path.exists(path)), None)
+    font = ImageFont.truetype(font_path, font_size) if font_path else ImageFont.load_default()
+    colors = [tuple(color) for color in script.CONFIG['text_colors']]
+
+    captures = []
+    for _ in range(count):
+        image = Image.new('RGB', size, (20, 24, 30))
+        draw = ImageDraw.Draw(image)
+        results = []
+        line_height = font_size * 5 // 3
+        for line in range(rng.randint(1, 4)):
+            text = ''.join(rng.choice(words) for _ in range(rng.randint(3, 10))) + rng.choice(script.PUNCTUATION)
+            position = (40, 20 + line * line_height)
+            x1, y1, x2, y2 = draw.textbbox(position, text, font=font)
+            draw.text(position, text, font=font, fill=rng.choice(colors))
+            results.append(([x1, y1, x2, y2], text, 1.0))
+        captures.append((np.asarray(image), results))
+    return captures
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def summarize(timings: dict) -> dict:
+    summary = {}
+    for stage, values in timings.items():
+        values = sorted(values)
+        total = sum(values)
+        summary[stage] = {
+            'count': len(values),
+            'per_second': len(values) / total if total else float('inf'),
+            'p50_ms': percentile(values, 50) * 1000,
+            'p90_ms': percentile(values, 90) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+        }
+    return summary
+
+
+def replay(captures: list, stub_reader=None, repeat=1) -> dict:
+    """
+    Time each pipeline stage over the captures. Returns {stage: [seconds, ...]}.
+    """
+    timings = {'preprocess': [], 'ocr': [], 'match': [], 'segment': []}
+
+    def timed(stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings[stage].append(time.perf_counter() - start)
+        return result
+
+    for _ in range(repeat):
+        for image, recorded_results in captures:
+            if stub_reader:
+                stub_reader.next_results = recorded_results
+
+            img_to_ocr = timed('preprocess', script.strict_preprocess_image, image)
+            easyocr_results = timed('ocr', script.perform_ocr, img_to_ocr)
+            timed('match', lambda: [script.find_vocab_matches(text.strip(script.PUNCTUATION)) for _, text, _ in easyocr_results])
+            timed('segment', script.segment_vocab, easyocr_results)
+
+    return timings
+
+
+def compare_to_baseline(summary: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for stage, stats in summary.items():
+        if stage not in baseline:
+            continue
+        limit = baseline[stage]['p50_ms'] * (1 + tolerance)
+        if stats['p50_ms'] > limit:
+            regressions.append(f"{stage}: p50 {stats['p50_ms']:.2f}ms > {baseline[stage]['p50_ms']:.2f}ms (+{tolerance:.0%})")
+    return regressions
+
+
+def print_summary(summary: dict):
+    print(f"{'stage':<12}{'count':>8}{'per sec':>12}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for stage, stats in summary.items():
+        print(f"{stage:<12}{stats['count']:>8}{stats['per_second']:>12.1f}"
+              f"{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+
+def load_captures(args) -> list[tuple[np.ndarray, list]]:
+    if args.save_dir:
+        return load_saved_captures(args.save_dir)
+    return render_synthetic_captures(args.synthetic, args.font)
+
+
+def run_replay(args) -> int:
+    script.CONFIG['verbose'] = False
+
+    captures = load_captures(args)
+    if not captures:
+        print("No captures to replay.")
+        return 1
+
+    stub_reader = None
+    if args.stub_ocr:
+        stub_reader = StubReader()
+        script.READER = StubLoader(stub_reader)
+    else:
+        script.READER = BackgroundReader(['ch_sim'], gpu=not args.cpu)
+        script.READER.get()
+
+    replay(captures[:1], stub_reader) # warm-up, builds the color filter and touches the dictionary
+    summary = summarize(replay(captures, stub_reader, args.repeat))
+    print(f"Replayed {len(captures)} captures x{args.repeat} ({'stub' if stub_reader else script.READER.get().device} OCR)")
+    print_summary(summary)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(summary, file, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as file:
+            regressions = compare_to_baseline(summary, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def character_error_rate(texts: list[str], references: list[str]) -> float:
+    errors = sum(edit_distance(text, reference) for text, reference in zip(texts, references))
+    return errors / max(1, sum(len(reference) for reference in references))
+
+
+def ocr_captures(captures: list, repeat=1) -> tuple[list[str], dict]:
+    """
+    OCR every capture. Returns the text of each capture (from the last repeat) and the latency stats
+    of each stage ('ocr' is the whole of perform_ocr).
+    """
+    script.METRICS.configure(enabled=True, path=None, window=len(captures) * repeat)
+    for _ in range(repeat):
+        texts = []
+        for image, _ in captures:
+            img_to_ocr = script.strict_preprocess_image(image) if script.CONFIG['preprocess_image'] else image
+            with script.METRICS.stage('ocr'):
+                easyocr_results = script.perform_ocr(img_to_ocr)
+            texts.append('\n'.join(text for _, text, _ in easyocr_results))
+    stats = script.METRICS.snapshot()
+    script.METRICS.configure(enabled=False)
+    return texts, stats
+
+
+def run_quantize(args) -> int:
+    script.CONFIG['verbose'] = False
+
+    captures = load_captures(args)
+    if not captures:
+        print("No captures to compare on.")
+        return 1
+
+    settings = script.CONFIG['cpu_inference']
+    configure_threads(args.threads or settings['intra_op_threads'], settings['inter_op_threads'])
+    # easyocr quantizes the recognizer on CPU unless told not to
+    readers = {'float': BackgroundReader(['ch_sim'], gpu=False, quantize=False),
+               'int8': BackgroundReader(['ch_sim'], gpu=False, quantize=True)}
+
+    texts, summary = {}, {}
+    for name, reader in readers.items():
+        script.READER = reader
+        reader.get()
+        ocr_captures(captures[:1]) # warm-up
+        texts[name], stats = ocr_captures(captures, args.repeat)
+        summary[name] = stats['recognition']
+
+    # synthetic captures know their text; saved captures only have what was recognized at the time
+    truth = ['\n'.join(text for _, text, _ in results) for _, results in captures]
+    float_p50 = summary['float']['p50_ms']
+
+    print(f"Recognized {len(captures)} captures x{args.repeat} on CPU ({torch_threads()} threads)")
+    print(f"{'recognizer':<12}{'p50 ms':>10}{'p90 ms':>10}{'speedup':>10}{'CER vs float':>14}{'CER vs truth':>14}")
+    for name in readers:
+        stats = summary[name]
+        print(f"{name:<12}{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}{float_p50 / stats['p50_ms']:>9.2f}x"
+              f"{character_error_rate(texts[name], texts['float']):>14.2%}{character_error_rate(texts[name], truth):>14.2%}")
+
+    drift = character_error_rate(texts['int8'], texts['float'])
+    if drift > args.max_cer:
+        print(f"int8 text differs from float by {drift:.2%} of characters (> {args.max_cer:.2%})")
+        return 1
+    return 0
+
+
+def run_autotune(args) -> int:
+    verbose, script.CONFIG['verbose'] = script.CONFIG['verbose'], False
+
+    if args.save_dir:
+        captures = load_saved_captures(args.save_dir)
+    else:
+        captures = render_synthetic_captures(args.synthetic, args.font, size=tuple(args.size), font_size=args.font_size)
+    if not captures:
+        print("No captures to tune on.")
+        return 1
+
+    script.READER = BackgroundReader(['ch_sim'], gpu=not args.cpu)
+    script.READER.get()
+    truth = ['\n'.join(text for _, text, _ in results) for _, results in captures]
+
+    # sweep every capture regardless of size, with scaling off as the reference
+    original = script.CONFIG['adaptive_scaling']
+    rows = []
+    for target in [None] + args.targets:
+        script.CONFIG['adaptive_scaling'] = {**original, 'enabled': target is not None, 'min_size': 0,
+                                             'target_text_height': target or original['target_text_height']}
+        ocr_captures(captures[:1]) # warm-up
+        texts, stats = ocr_captures(captures, args.repeat)
+        rows.append((target, stats['ocr']['p50_ms'], stats['detection']['p50_ms'], character_error_rate(texts, truth)))
+    script.CONFIG['adaptive_scaling'] = original
+
+    best_cer = min(cer for _, _, _, cer in rows)
+    candidates = [row for row in rows if row[3] <= best_cer + args.max_cer_increase]
+    best = min(candidates, key=lambda row: row[1])
+
+    print(f"Tuned on {len(captures)} captures x{args.repeat} ({script.READER.get().device} OCR)")
+    print(f"{'target px':<12}{'ocr p50 ms':>12}{'detect p50 ms':>15}{'CER':>8}")
+    for target, ocr_ms, detect_ms, cer in rows:
+        print(f"{target or 'off':<12}{ocr_ms:>12.1f}{detect_ms:>15.1f}{cer:>8.2%}{'  <- best' if (target, ocr_ms) == best[:2] else ''}")
+
+    if args.save:
+        script.CONFIG['verbose'] = verbose
+        script.CONFIG.set(('adaptive_scaling', {**original, 'enabled': best[0] is not None,
+                                                'target_text_height': best[0] or original['target_text_height']}))
+        script.CONFIG.flush()
+        print("Saved to config.json")
+    return 0
+
+
+def rss_mb():
+    """
+    Resident memory of this process in MB, or None if it can't be read here.
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def soak(captures: list, count: int, backend, stub_reader, sample_every=100, hovers=5, add_every=10, seed=0) -> list[dict]:
+    """
+    Run count captures (cycling through captures) the way the overlay does: clear the previous
+    overlay, OCR, render the cards, then hover over some words and add one to Anki now and then.
+    Returns a sample of memory and handle counts every sample_every captures.
+    """
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        image, recorded_results = captures[i % len(captures)]
+        stub_reader.next_results = recorded_results
+
+        backend.clear_overlays()
+        region_results = script.process_regions([image])
+        canvas = script.render_regions(region_results, [[0, 0, image.shape[1], image.shape[0]]])
+
+        for card in rng.sample(canvas.vocab_cards, min(hovers, len(canvas.vocab_cards))):
+            if isinstance(backend, RecordingBackend):
+                backend.position = ((card.bbox[0] + card.bbox[2]) // 2, (card.bbox[1] + card.bbox[3]) // 2)
+                backend.run_scheduled()
+            else:
+                # the real pointer can't be moved, so focus the word the way track_pointer would
+                canvas.shift_focus(card)
+                backend.root.update()
+        if canvas.focused and i % add_every == 0:
+            canvas.focused.add_to_anki()
+
+        if (i + 1) % sample_every == 0:
+            gc.collect()
+            samples.append({'captures': i + 1, 'rss_mb': rss_mb(), 'objects': len(gc.get_objects()), **backend.counts()})
+    return samples
+
+
+def check_growth(samples: list, warmup: float, max_rss_growth: float, max_object_growth: float, max_windows: int) -> list[str]:
+    """
+    Compare the median of the first and last three samples after the warm-up, and check the handle
+    counts of every sample against their bounds.
+    """
+    failures = []
+    for sample in samples:
+        if sample['overlays'] > 1 or sample['scheduled'] > 1 or sample['windows'] > max_windows:
+            failures.append(f"after {sample['captures']} captures: {sample['overlays']} overlays, {sample['windows']} windows, "
+                            f"{sample['scheduled']} scheduled callbacks (bounds 1, {max_windows}, 1)")
+            break
+
+    steady = samples[int(len(samples) * warmup):]
+    if len(steady) < 6:
+        failures.append(f"only {len(steady)} samples after the warm-up, need 6 (lower --sample-every)")
+        return failures
+
+    def growth(key):
+        first, last = np.median([s[key] for s in steady[:3]]), np.median([s[key] for s in steady[-3:]])
+        return first, last
+
+    if steady[0]['rss_mb'] is not None:
+        first, last = growth('rss_mb')
+        if last - first > max_rss_growth:
+            failures.append(f"RSS grew from {first:.1f}MB to {last:.1f}MB (> {max_rss_growth}MB)")
+    first, last = growth('objects')
+    if last > first * (1 + max_object_growth):
+        failures.append(f"live objects grew from {first:.0f} to {last:.0f} (> {max_object_growth:.0%})")
+    return failures
+
+
+def run_soak(args) -> int:
+    script.CONFIG['verbose'] = False
+    script.CONFIG['save_data'] = False
+    # stub results are whole-capture results, which don't map onto tiles
+    script.CONFIG['tiling'] = {**script.CONFIG['tiling'], 'enabled': False}
+
+    captures = load_captures(args)
+    if not captures:
+        print("No captures to soak with.")
+        return 1
+
+    stub_reader = StubReader()
+    script.READER = StubLoader(stub_reader)
+    script.ANKI = StubAnki()
+    if args.tk:
+        from tkinter import Tk
+        script.root = Tk()
+        script.RENDER_BACKEND = TkBackend(script.root)
+    else:
+        script.RENDER_BACKEND = RecordingBackend()
+    script.CARD_POOL = CardPool(script.RENDER_BACKEND, **script.CONFIG['card_pool'])
+
+    start = time.perf_counter()
+    samples = soak(captures, args.captures, script.RENDER_BACKEND, stub_reader, args.sample_every)
+    elapsed = time.perf_counter() - start
+
+    print(f"Soaked {args.captures} captures ({len(captures)} distinct, {'Tk' if args.tk else 'headless'} rendering) "
+          f"in {elapsed:.1f}s, {script.ANKI.added} cards added")
+    print(f"{'captures':>10}{'RSS MB':>10}{'objects':>10}{'overlays':>10}{'windows':>10}{'widgets':>10}{'scheduled':>10}")
+    for sample in samples:
+        rss = f"{sample['rss_mb']:.1f}" if sample['rss_mb'] is not None else '-'
+        print(f"{sample['captures']:>10}{rss:>10}{sample['objects']:>10}{sample['overlays']:>10}"
+              f"{sample['windows']:>10}{sample['widgets']:>10}{sample['scheduled']:>10}")
+
+    failures = check_growth(samples, args.warmup, args.max_rss_growth, args.max_object_growth, script.CARD_POOL.max_windows)
+    for failure in failures:
+        print(f"Leak: {failure}")
+    return 1 if failures else 0
+
+
+def torch_threads() -> int:
+    import torch
+    return torch.get_num_threads()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    replay_parser = commands.add_parser('replay', help="replay saved or synthetic captures through the pipeline stages")
+    replay_parser.add_argument('save_dir', nargs='?', help="save_dir of saved captures (default: synthetic captures)")
+    replay_parser.add_argument('--synthetic', type=int, default=50, help="number of synthetic captures to render")
+    replay_parser.add_argument('--font', help="font file for synthetic captures (default: first CJK font found)")
+    replay_parser.add_argument('--stub-ocr', action='store_true', help="replay recorded results instead of running the model")
+    replay_parser.add_argument('--cpu', action='store_true', default=True, help="run the model on CPU (default)")
+    replay_parser.add_argument('--gpu', dest='cpu', action='store_false', help="run the model on GPU if available")
+    replay_parser.add_argument('--repeat', type=int, default=1)
+    replay_parser.add_argument('--baseline', default='benchmark_baseline.json')
+    replay_parser.add_argument('--save-baseline', action='store_true')
+    replay_parser.add_argument('--tolerance', type=float, default=0.2, help="allowed p50 regression vs baseline")
+    replay_parser.set_defaults(handler=run_replay)
+
+    quantize_parser = commands.add_parser('quantize', help="compare the int8 and float recognizers on CPU")
+    quantize_parser.add_argument('save_dir', nargs='?', help="save_dir of saved captures (default: synthetic captures)")
+    quantize_parser.add_argument('--synthetic', type=int, default=50, help="number of synthetic captures to render")
+    quantize_parser.add_argument('--font', help="font file for synthetic captures (default: first CJK font found)")
+    quantize_parser.add_argument('--repeat', type=int, default=1)
+    quantize_parser.add_argument('--threads', type=int, default=0, help="intra-op threads (default: cpu_inference in config.json)")
+    quantize_parser.add_argument('--max-cer', type=float, default=0.02, help="allowed character error rate of int8 vs float")
+    quantize_parser.set_defaults(handler=run_quantize)
+
+    autotune_parser = commands.add_parser('autotune', help="sweep adaptive_scaling.target_text_height for speed and accuracy")
+    autotune_parser.add_argument('save_dir', nargs='?', help="save_dir of saved captures (default: synthetic captures)")
+    autotune_parser.add_argument('--synthetic', type=int, default=20, help="number of synthetic captures to render")
+    autotune_parser.add_argument('--size', type=int, nargs=2, default=[3440, 1440], metavar=('WIDTH', 'HEIGHT'), help="size of synthetic captures")
+    autotune_parser.add_argument('--font', help="font file for synthetic captures (default: first CJK font found)")
+    autotune_parser.add_argument('--font-size', type=int, default=64)
+    autotune_parser.add_argument('--targets', type=int, nargs='+', default=[16, 20, 24, 32, 40, 48])
+    autotune_parser.add_argument('--cpu', action='store_true', default=True, help="run the model on CPU (default)")
+    autotune_parser.add_argument('--gpu', dest='cpu', action='store_false', help="run the model on GPU if available")
+    autotune_parser.add_argument('--repeat', type=int, default=1)
+    autotune_parser.add_argument('--max-cer-increase', type=float, default=0.01, help="accuracy to give up for speed vs the most accurate setting")
+    autotune_parser.add_argument('--save', action='store_true', help="write the best setting to config.json")
+    autotune_parser.set_defaults(handler=run_autotune)
+
+    soak_parser = commands.add_parser('soak', help="run a long session with stub OCR and check for growing memory or handles")
+    soak_parser.add_argument('save_dir', nargs='?', help="save_dir of saved captures (default: synthetic captures)")
+    soak_parser.add_argument('--synthetic', type=int, default=50, help="number of distinct synthetic captures to render")
+    soak_parser.add_argument('--font', help="font file for synthetic captures (default: first CJK font found)")
+    soak_parser.add_argument('--captures', type=int, default=2000, help="number of captures to run")
+    soak_parser.add_argument('--sample-every', type=int, default=100)
+    soak_parser.add_argument('--warmup', type=float, default=0.2, help="fraction of samples to ignore while caches fill")
+    soak_parser.add_argument('--max-rss-growth', type=float, default=16, help="allowed RSS growth in MB after the warm-up")
+    soak_parser.add_argument('--max-object-growth', type=float, default=0.02, help="allowed growth in live objects after the warm-up")
+    soak_parser.add_argument('--tk', action='store_true', help="render real Tk windows instead of recording (needs a display)")
+    soak_parser.set_defaults(handler=run_soak)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
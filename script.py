@@ -5,49 +5,87 @@ It captures a selected region of the screen, preprocesses the image, and perform
 The extracted text is then matched with a Chinese-English dictionary to find the corresponding translations.
 The script also provides functionality to manually configure the bounding box for capturing the screen region.
 """
+import time
+_import_start = time.perf_counter()
+
+import atexit
 import os
 import sys
-import threading
-import uuid
-import cv2
-import easyocr
 from PIL import Image
 import numpy as np
-import yaml
-import pyautogui
-import json
 from tkinter import Tk, Canvas, Toplevel, Frame, Label, TclError
-from utils.vocab import VocabCanvas
-import keyboard
-import mouse
-
-with open('config.json', 'r') as file:
-    CONFIG = json.load(file)
-
-def update_config(*args):
-    for key, value in args:
-        if key in CONFIG: CONFIG[key] = value
-    with open('config.json', 'w') as file:
-        json.dump(CONFIG, file, indent=4)
-
-# Create a reader for Chinese
-reader = easyocr.Reader(['ch_sim'])
-print("EasyOCR initiated using " + reader.device)
-
-# Load the Chinese-English dictionary
-with open('utils/sim_cn_dictionary.json', 'r') as file:
-    list_of_dicts = json.load(file)
-    DICTIONARY = {}
-    for entry in list_of_dicts:
-        if entry['simplified'] in DICTIONARY:
-            # If the simplified character is already in the dictionary, append the new entry to its list
-            DICTIONARY[entry['simplified']].append((entry['traditional'], entry['pinyin'], entry['english']))
-        else:
-            # If the simplified character is not in the dictionary, add it with a list containing one pronunciation
-            DICTIONARY[entry['simplified']] = [(entry['traditional'], entry['pinyin'], entry['english'])]
-    
-    PUNCTUATION = '，,。…"?!'
-    ALLOW_LIST = ''.join(set(''.join(DICTIONARY.keys()))) + PUNCTUATION
+from utils.vocab import VocabCanvas, CardPool
+from utils.render_backend import TkBackend
+from utils.compiled_dictionary import CompiledDictionary, compile_dictionary_json
+from utils.ocr_reader import BackgroundReader
+from utils.capture_cache import CaptureCache
+from utils.mosaic import stack_regions, split_results
+from utils.color_filter import ColorFilter
+from utils.pipeline import CapturePipeline
+from utils.metrics import METRICS
+from utils.ocr_store import OCRStore
+from utils.anki import AnkiClient
+from utils.capture import ScreenBackend
+from utils.layout_cache import LayoutCache
+from utils.watch import Watcher
+from utils.lookup_client import LookupClient, same_endpoint
+from utils.cpu_inference import cpu_reader_kwargs
+from utils.scaling import estimate_text_height, choose_scale
+from utils.tiling import text_tiles, merge_tile_results
+from utils.config_store import ConfigStore
+
+# Seconds spent in each startup phase, reported once the OCR model is ready
+STARTUP_TIMINGS = {'imports': time.perf_counter() - _import_start}
+
+# Loaded once; CONFIG.set() saves changes in the background, and edits to the file are picked up while running
+CONFIG = ConfigStore('config.json')
+atexit.register(CONFIG.flush)
+
+METRICS.configure(**CONFIG['metrics'])
+CONFIG.subscribe(lambda changed: METRICS.configure(**CONFIG['metrics']), 'metrics')
+
+# Load the Chinese-English dictionary, compiling it from the JSON source on first run
+_dictionary_start = time.perf_counter()
+DICTIONARY_JSON = 'utils/sim_cn_dictionary.json'
+DICTIONARY_PATH = 'utils/sim_cn_dictionary.bin'
+if not os.path.exists(DICTIONARY_PATH) or \
+        (os.path.exists(DICTIONARY_JSON) and os.path.getmtime(DICTIONARY_JSON) > os.path.getmtime(DICTIONARY_PATH)):
+    print("Compiling dictionary . . .")
+    compile_dictionary_json(DICTIONARY_JSON, DICTIONARY_PATH)
+DICTIONARY = CompiledDictionary(DICTIONARY_PATH)
+
+PUNCTUATION = '，,。…"?!'
+ALLOW_LIST = DICTIONARY.allow_list + PUNCTUATION
+STARTUP_TIMINGS['dictionary load'] = time.perf_counter() - _dictionary_start
+
+def report_startup(loader: BackgroundReader):
+    print("EasyOCR initiated using " + loader.get().device)
+    timings = {**STARTUP_TIMINGS, **loader.timings}
+    print("Startup: " + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items()))
+
+# Where screenshots come from. Swap for an ArrayBackend to run the pipeline headless.
+CAPTURE_BACKEND = ScreenBackend()
+
+# Line boxes detected in the fixed dialog regions, reused while their layout doesn't change
+LAYOUT_CACHE = LayoutCache(**{k: v for k, v in CONFIG['layout_cache'].items() if k != 'enabled'})
+
+# Saved captures and OCR results, written on a background thread when save_data is on
+OCR_STORE = OCRStore(**CONFIG['ocr_store'])
+
+# Adds vocab cards to Anki in batches from a background thread
+ANKI = AnkiClient(**CONFIG['anki'])
+CONFIG.subscribe(lambda changed: ANKI.configure(**CONFIG['anki']), 'anki')
+
+# Results of recent captures, so re-capturing an unchanged screen skips OCR
+CAPTURE_CACHE = CaptureCache(**CONFIG['capture_cache'])
+
+# Create a reader for Chinese. It loads on a background thread once started (or on first use).
+# Without a GPU, the reader gets the cpu_inference thread budget and easyocr's int8 recognizer.
+READER = BackgroundReader(['ch_sim'], on_ready=report_startup, **cpu_reader_kwargs(**CONFIG['cpu_inference']))
+
+# With daemon.enabled, OCR runs in a separate server.py process that keeps the model loaded, and no reader is loaded here
+LOOKUP_CLIENT = LookupClient(f"http://{CONFIG['daemon']['host']}:{CONFIG['daemon']['port']}", CONFIG['daemon']['timeout']) \
+    if CONFIG['daemon']['enabled'] else None
 
 def clear_canvases(root: Tk):
     for widget in root.winfo_children():
@@ -123,10 +161,12 @@ def configure_bbox():
     responses_bbox = draw_manual_bbox()
     if not dialog_bbox or not responses_bbox:
         return
-    update_config(('dialog_bbox', dialog_bbox), ('responses_bbox', responses_bbox))
+    CONFIG.set(('dialog_bbox', dialog_bbox), ('responses_bbox', responses_bbox))
     print("Configuration saved.")
 
 def pick_text_color():
+    import pyautogui
+
     clear_canvases(root)
 
     root.attributes('-topmost', True)
@@ -169,10 +209,8 @@ def pick_text_color():
         x, y = event.x, event.y
         color = pyautogui.pixel(x, y)
 
-        current_list = CONFIG['text_colors']
-        if list(color) not in current_list:
-            current_list.append(color)
-            update_config(('text_color', current_list))
+        if list(color) not in CONFIG['text_colors']:
+            CONFIG.set(('text_colors', CONFIG['text_colors'] + [list(color)]))
     
     def on_escape(event):
         safe_destroy_canvas()
@@ -204,48 +242,97 @@ def capture(bbox=None, fullscreen=False):
             If not provided, a manual bounding box will be prompted for user input.
 
     Returns:
-        tuple: A tuple containing the processed image and the converted bounding box coordinates [x1, y1, x2, y2].
+        tuple: A tuple containing the captured image (numpy RGB array) and the converted bounding box coordinates [x1, y1, x2, y2].
 
     """
+    width, height = CAPTURE_BACKEND.screen_size()
     if fullscreen:
-        bbox = [0, 0, pyautogui.size().width, pyautogui.size().height]
+        bbox = [0, 0, width, height]
         # crop out bottom UID
         bbox[3] -= 40
     else:
-        bbox = bbox or draw_manual_bbox() or [0, 0, pyautogui.size().width, pyautogui.size().height - 40]
+        bbox = bbox or draw_manual_bbox() or [0, 0, width, height - 40]
+
+    return capture_many([bbox])[0]
 
-    # Capture the selected area of the game window
-    img = pyautogui.screenshot(region=bbox)
+def capture_many(bboxes: list) -> list[tuple[np.ndarray, list[int]]]:
+    """
+    Capture several (x, y, width, height) areas with a single screenshot of their union.
 
-    bbox = [bbox[0], bbox[1], bbox[0] + bbox[2], bbox[1] + bbox[3]] # [x1, y1, x2, y2]
-    return img, bbox
+    Returns:
+        list: (image, [x1, y1, x2, y2]) per area. The images are views into one shared buffer.
+    """
+    # Capture the selected areas of the game window
+    images = CAPTURE_BACKEND.grab(bboxes)
 
-def strict_preprocess_image(img: Image.Image, tolerance=10) -> Image.Image:
-    # Remove all pixels that are not text colors
-    image = cv2.cvtColor(np.array(img), cv2.COLOR_BGRA2BGR)
-    
-    lower_bounds = [np.array([max(0, c - tolerance) for c in color]) for color in CONFIG['text_colors']]
-    upper_bounds = [np.array([min(255, c + tolerance) for c in color]) for color in CONFIG['text_colors']]
+    return [(img, [bbox[0], bbox[1], bbox[0] + bbox[2], bbox[1] + bbox[3]]) for img, bbox in zip(images, bboxes)] # [x1, y1, x2, y2]
 
-    masks = [cv2.inRange(image, lower, upper) for lower, upper in zip(lower_bounds, upper_bounds)]
-    mask = masks[0]
-    for m in masks[1:]:
-        mask = cv2.bitwise_or(mask, m)
+# Config keys the strict mode color filter (and everything OCR'd through it) depends on
+COLOR_KEYS = ('text_colors', 'color_tolerance', 'color_metric')
+_color_filter = None
 
-    masked_image = cv2.bitwise_and(image, image, mask=mask)
+def _reset_color_filter(changed):
+    global _color_filter
+    _color_filter = None
+
+CONFIG.subscribe(_reset_color_filter, *COLOR_KEYS)
+
+def get_color_filter() -> ColorFilter:
+    """
+    Return the strict mode color filter, rebuilding it only after the text colors or tolerance change.
+    """
+    global _color_filter
+    if _color_filter is None:
+        _color_filter = ColorFilter(CONFIG['text_colors'], CONFIG['color_tolerance'], CONFIG['color_metric'])
+    return _color_filter
+
+def sample_dialog() -> np.ndarray:
+    """
+    Return a downsampled strict mode mask of the dialog region for the watch mode change gate,
+    or None to skip sampling while the model is loading or a card is shown over the screen.
+    """
+    if (LOOKUP_CLIENT is None and not READER.is_ready) or CARD_POOL.visible:
+        return None
+    step = CONFIG['watch']['downsample']
+    (image, _), = capture_many([CONFIG['dialog_bbox']])
+    return get_color_filter().mask(np.ascontiguousarray(image[::step, ::step]))
+
+def pick_input_scale(img: np.ndarray) -> float:
+    """
+    Return the factor to downscale a large capture by before OCR, so its text ends up about
+    adaptive_scaling.target_text_height px tall. Small captures (and captures without text in the
+    text colors) are left at full size.
+    """
+    settings = CONFIG['adaptive_scaling']
+    if not settings['enabled'] or max(img.shape[:2]) < settings['min_size']:
+        return 1.0
+
+    # the text color mask of every third pixel is plenty to measure characters tens of px tall
+    step = 3
+    mask = get_color_filter().mask(np.ascontiguousarray(img[::step, ::step, :3]))
+    text_height = estimate_text_height(mask)
+    text_height = text_height and text_height * step
+    scale = choose_scale(text_height, settings['target_text_height'], settings['min_scale'])
+    if CONFIG["verbose"] and scale < 1: print(f"Text ~{text_height:.0f}px tall, OCR at {scale:.0%} scale")
+    return scale
+
+def strict_preprocess_image(img: np.ndarray) -> np.ndarray:
+    # Remove all pixels that are not text colors
+    masked_image = get_color_filter().apply(img)
 
-    # Convert the processed image back to PIL format
-    img = Image.fromarray(masked_image)
-    if CONFIG["verbose"]: img.show()
-    return img
+    if CONFIG["verbose"]: Image.fromarray(masked_image).show()
+    return masked_image
 
 
-def perform_ocr(img: Image.Image) -> list[tuple[list[int], str, float]]:
+def perform_ocr(img: np.ndarray, batch_size=3, layout_key=None) -> list[tuple[list[int], str, float]]:
     """
     Perform OCR on the given image using EasyOCR.
 
     Args:
-        img (PIL.Image.Image): The input image to perform OCR on.
+        img (np.ndarray): The RGB(A) or grayscale image to perform OCR on.
+        batch_size (int): Number of text lines recognized per model batch.
+        layout_key (optional): Identifies a fixed capture region. In strict mode with layout_cache enabled,
+            the line boxes detected for it are reused (recognition only) while its text layout is stable.
 
     Returns:
         list[tuple[list[int], str, float]]: A list of tuples containing the bounding box coordinates,
@@ -253,161 +340,333 @@ def perform_ocr(img: Image.Image) -> list[tuple[list[int], str, float]]:
 
         bbox = [x1, y1, x2, y2]
     """
-    # Perform OCR with EasyOCR
-    easyocr_results = reader.readtext(np.array(img),
-                                      decoder='wordbeamsearch',
-                                      batch_size=3,
-                                      allowlist=ALLOW_LIST
-                                      )
+    import cv2
+
+    reader = READER.get()
+
+    # Same steps as reader.readtext, split so detection and recognition are timed separately
+    img = np.asarray(img)
+    if img.ndim == 2:
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    else:
+        img = img[:, :, :3]
+
+    # Large captures are shrunk so characters are about the size the models work best at
+    with METRICS.stage('scaling'):
+        scale = 1.0 if layout_key is not None else pick_input_scale(img)
+    if scale < 1:
+        img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    img_cv_grey = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    horizontal_list = free_list = None
+    use_layout_cache = layout_key is not None and CONFIG['layout_cache']['enabled'] and CONFIG['preprocess_image']
+    if use_layout_cache:
+        # strict mode blacks out everything but text, so any lit pixel is ink
+        mask = img_cv_grey > 0
+        horizontal_list, free_list = LAYOUT_CACHE.lookup(layout_key, mask), []
+        if CONFIG["verbose"] and horizontal_list is not None: print("Reusing cached text layout")
+
+    if horizontal_list is None:
+        with METRICS.stage('detection'):
+            # a downscaled image is already the size to detect at, so detect() mustn't resize it again
+            detect_kwargs = {'canvas_size': max(img.shape[:2])} if scale < 1 else {}
+            horizontal_lists, free_lists = reader.detect(img, **detect_kwargs)
+        horizontal_list, free_list = horizontal_lists[0], free_lists[0]
+        if use_layout_cache and not free_list:
+            LAYOUT_CACHE.store(layout_key, mask, horizontal_list)
+
+    with METRICS.stage('recognition'):
+        easyocr_results = reader.recognize(img_cv_grey, horizontal_list, free_list,
+                                           decoder='wordbeamsearch',
+                                           batch_size=batch_size,
+                                           allowlist=ALLOW_LIST
+                                           )
     easyocr_text = "\n".join([item[1] for item in easyocr_results])
     if CONFIG["verbose"]: print(easyocr_text)
 
     # Filter out text regions with low confidence
     # easyocr_results = [item for item in easyocr_results if item[2] > CONFIG['confidence_threshold']]
     
-    # change bbox format to [x1, y1, x2, y2]
+    # change bbox format to [x1, y1, x2, y2], in the coordinates of the full size image
     for i, item in enumerate(easyocr_results):
         new_bbox = [item[0][0][0], item[0][0][1], item[0][2][0], item[0][2][1]]
+        if scale < 1:
+            new_bbox = [int(v / scale) for v in new_bbox]
         easyocr_results[i] = (new_bbox, item[1], item[2])
     
     return easyocr_results
 
-def find_vocab_matches(text: str) -> list:
-    matches = []
-    # greedily match the longest possible string for each starting position i in len(text)
-    for i in range(len(text)):
-        current = text[i]
-        for j in range(i + 1, len(text)):
-            if current + text[j] in DICTIONARY:
-                current += text[j]
-            else:
-                break
-
-        if current in DICTIONARY:
-            matches.append(current)
-        else:
-            matches.append(None)
+def perform_ocr_batch(images: list, layout_key=None) -> list[list[tuple[list[int], str, float]]]:
+    """
+    Perform OCR on several region images with a single detection and recognition pass.
+
+    The regions are stacked into one mosaic, OCR'd together, and the results split back per region
+    in each region's own coordinates. layout_key is passed on to perform_ocr for the mosaic.
+    """
+    if len(images) == 1:
+        return [perform_ocr(images[0], layout_key=layout_key)]
 
-    return matches # should be len(text) long
+    mosaic, y_offsets = stack_regions(images)
+    results = perform_ocr(mosaic, batch_size=3 * len(images), layout_key=layout_key)
+    return split_results(results, y_offsets, [np.asarray(img).shape[0] for img in images])
 
-def save_ocr_data(image: Image.Image, ocr_results, save_dir):
+def perform_ocr_tiled(img: np.ndarray) -> list[tuple[list[int], str, float]]:
     """
-    Save img to saved_data/images and ocr results to saved_data/ocr_data.yaml
+    Perform OCR on only the parts of a large capture that contain text.
+
+    Tiles around the rows of text-colored pixels are cut out and OCR'd together with perform_ocr_batch,
+    and their results merged back into image coordinates without duplicates. Empty areas are never
+    OCR'd, so a screen of mostly scenery costs little. Only used in strict mode, where the text colors
+    are known to be the text. Falls back to perform_ocr for small captures, when no tiles are found,
+    or when the tiles would cover most of the capture anyway.
     """
-     # Ensure the directory and subdirectory exist
-    image_dir = os.path.join(save_dir, 'images')
-    os.makedirs(image_dir, exist_ok=True)
-
-    image_id = str(uuid.uuid4())
-    image_path = os.path.join(image_dir, f"{image_id}.png")
-
-    image.save(image_path)
-
-    yaml_ocr_results = []
-    for bbox, text, confidence in ocr_results:
-        result = {
-            'bbox': [int(x) for x in bbox],
-            'text': text,
-            'confidence': float(confidence)
-        }
-        yaml_ocr_results.append(result)
-
-    ocr_data = {
-        'image_id': image_id,
-        'results': yaml_ocr_results
-    }
+    settings = CONFIG['tiling']
+    img = np.asarray(img)
+    if not settings['enabled'] or not CONFIG['preprocess_image'] or img.ndim == 2 or max(img.shape[:2]) < settings['min_size']:
+        return perform_ocr(img)
+
+    with METRICS.stage('tiling'):
+        # find the tiles on a mask of every other pixel, then scale them back up
+        step = 2
+        mask = get_color_filter().mask(np.ascontiguousarray(img[::step, ::step, :3]))
+        tiles = [[v * step for v in tile] for tile in text_tiles(mask, margin=settings['margin'] // step)]
+    if not tiles:
+        return perform_ocr(img)
+    area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in tiles)
+    if area > settings['max_coverage'] * img.shape[0] * img.shape[1]:
+        return perform_ocr(img)
+    if CONFIG["verbose"]: print(f"OCR'ing {len(tiles)} tiles, {area / (img.shape[0] * img.shape[1]):.0%} of the capture")
+
+    per_tile = perform_ocr_batch([img[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles])
+    return merge_tile_results(per_tile, tiles, settings['iou_threshold'])
 
-    yaml_file_path = os.path.join(save_dir, 'ocr_data.yaml')
-    with open(yaml_file_path, 'a', encoding='utf-8') as file:
-        yaml.dump([ocr_data], file, allow_unicode=True)
+def find_vocab_matches(text: str) -> list:
+    # longest dictionary word starting at each position i in len(text)
+    return DICTIONARY.longest_matches(text) # should be len(text) long
 
-def thread_save_ocr_data(image, ocr_results, save_dir):
+def segment_vocab(easyocr_results) -> list[tuple[str, list[int]]]:
     """
-    Wrapper function to run save_ocr_data in a separate thread.
+    Match vocab in each OCR line and split the line's bbox evenly between its characters.
+
+    Returns:
+        list[tuple[str, list[int]]]: (vocab, [x1, y1, x2, y2]) for every matched position,
+        in the same coordinates as the OCR results.
     """
-    if not CONFIG['save_data']:
-        return
-    
-    thread = threading.Thread(target=save_ocr_data, args=(image, ocr_results, save_dir))
-    thread.start()
-    return thread
+    vocab_boxes = []
+    for bbox, text, confidence in easyocr_results: # bbox = [x1, y1, x2, y2]
+        if not text: continue
 
-def run(manual=False, fullscreen=False):
+        x1, y1, x2, y2 = bbox
+        if text[-1] == '?': # jank but helps calibrate character positions
+            x2 -= 30
+        elif text[-1] in PUNCTUATION:
+            x2 -= 20
+        text = text.strip(PUNCTUATION)
+        matches = find_vocab_matches(text)
+        if not matches: continue
+
+        # segment bbox into len(matches) parts
+        width = ( x2 - x1 ) / len(matches)
+
+        for n, vocab in enumerate(matches):
+            if not vocab: continue
+            vocab_boxes.append((vocab, [int(x1 + n * width), int(y1), int(x1 + (n + 1) * width), int(y2)]))
+
+    return vocab_boxes
+
+def capture_regions(manual=False, fullscreen=False) -> tuple[list, list, tuple]:
+    """
+    Clear the overlay and capture the regions to OCR. Must run on the Tk thread.
+
+    Returns:
+        tuple: The region images, their [x1, y1, x2, y2] screen offsets, and a layout key
+        for the fixed dialog regions (None for fullscreen and manual captures).
+    """
     clear_canvases(root)
 
+    if LOOKUP_CLIENT is None and not READER.is_ready:
+        print("EasyOCR is still loading, the capture will be processed once it is ready . . .")
+
+    layout_key = None
     if manual:
         image, offset = capture()
         to_ocr, offsets = [image], [offset]
     elif fullscreen:
-        image, offset = capture(fullscreen=True)
+        with METRICS.stage('screenshot'):
+            image, offset = capture(fullscreen=True)
         to_ocr, offsets = [image], [offset]
     else:
-        dialog_img, dialog_offset = capture(bbox=CONFIG['dialog_bbox'])
-        responses_img, responses_offset = capture(bbox=CONFIG['responses_bbox'])
+        with METRICS.stage('screenshot'):
+            (dialog_img, dialog_offset), (responses_img, responses_offset) = capture_many([CONFIG['dialog_bbox'], CONFIG['responses_bbox']])
         to_ocr, offsets = [dialog_img, responses_img], [dialog_offset, responses_offset]
-    
-    vocab_canvas = VocabCanvas(root)
+        layout_key = ('dialog', tuple(offsets[0]), tuple(offsets[1]))
 
-    for i, img in enumerate(to_ocr):
-        img_to_ocr = strict_preprocess_image(img) if CONFIG['preprocess_image'] else img
-        easyocr_results = perform_ocr(img_to_ocr)
+    return to_ocr, offsets, layout_key
 
-        if not easyocr_results:
-            print("No text detected.")
-            continue
+def process_regions(to_ocr: list, is_current=lambda: True, layout_key=None) -> list:
+    """
+    OCR the region images and match vocab, reusing cached results where possible.
 
-        for item in easyocr_results:
-            bbox, text, confidence = item # bbox = [x1, y1, x2, y2]
-            if not text: continue
+    Args:
+        to_ocr (list): The region images.
+        is_current (callable): Returns False once the capture has been superseded, to skip the OCR.
+        layout_key (optional): Set for fixed regions, to reuse their detected text layout.
+            Not used when OCR goes through the lookup server (daemon.enabled).
 
-            if text[-1] == '?': # jank but helps calibrate character positions
-                bbox[2] -= 30
-            elif text[-1] in PUNCTUATION:
-                bbox[2] -= 20
-            text = text.strip(PUNCTUATION)
-            matches = find_vocab_matches(text)
-            if not matches: continue
+    Returns:
+        list: (easyocr_results, vocab_boxes) per region, in region coordinates.
+    """
+    settings = CONFIG.revision(*COLOR_KEYS, 'preprocess_image')
+    CAPTURE_CACHE.validate(settings)
+    LAYOUT_CACHE.validate(settings)
+
+    cache_keys = [CAPTURE_CACHE.key(img) for img in to_ocr]
+    region_results = [CAPTURE_CACHE.get(key) for key in cache_keys]
+    if CONFIG["verbose"] and any(region_results): print("Reusing cached OCR results")
+
+    # OCR every region that missed the cache in one batched call
+    pending = [i for i, cached in enumerate(region_results) if cached is None]
+    if pending:
+        with METRICS.stage('preprocess'):
+            imgs_to_ocr = [strict_preprocess_image(to_ocr[i]) if CONFIG['preprocess_image'] else to_ocr[i] for i in pending]
+        if not is_current(): return []
+        if LOOKUP_CLIENT:
+            # the server OCRs whole regions: no tiling and no layout cache in this mode
+            try:
+                batch_results = LOOKUP_CLIENT.ocr(imgs_to_ocr)
+            except RuntimeError as e:
+                print(f"Capture not OCR'd, start the lookup server with py server.py or set daemon.enabled to false ({e})")
+                return []
+        elif layout_key is None and len(imgs_to_ocr) == 1:
+            batch_results = [perform_ocr_tiled(imgs_to_ocr[0])]
+        else:
+            batch_results = perform_ocr_batch(imgs_to_ocr, layout_key=layout_key and (layout_key, tuple(pending)))
+        with METRICS.stage('vocab matching'):
+            for i, easyocr_results in zip(pending, batch_results):
+                region_results[i] = (easyocr_results, segment_vocab(easyocr_results))
+                CAPTURE_CACHE.put(cache_keys[i], region_results[i])
 
-            # apply offset to bbox
-            offset = offsets[i]
-            bbox = [bbox[0] + offset[0], bbox[1] + offset[1], bbox[2] + offset[0], bbox[3] + offset[1]]
+        if CONFIG['save_data']:
+            for i, easyocr_results in zip(pending, batch_results):
+                OCR_STORE.submit(to_ocr[i], easyocr_results)
 
-            # segment bbox into len(matches) parts
-            x1, y1, x2, y2 = bbox
+    return region_results
 
-            width = ( x2 - x1 ) / len(matches)
+def render_regions(region_results: list, offsets: list):
+    """
+    Draw a vocab card for every matched word and return the VocabCanvas. Must run on the Tk thread.
+    """
+    with METRICS.stage('card creation'):
+        vocab_canvas = VocabCanvas(RENDER_BACKEND, ANKI, CARD_POOL)
+
+        for (easyocr_results, vocab_boxes), offset in zip(region_results, offsets):
+            if not easyocr_results:
+                print("No text detected.")
+                continue
 
-            for n, vocab in enumerate(matches):
-                if not vocab: continue
-                vocab_bbox = [int(x1 + n * width), int(y1), int(x1 + (n + 1) * width), int(y2)]
+            for vocab, (x1, y1, x2, y2) in vocab_boxes:
+                # apply offset to bbox
+                vocab_bbox = [x1 + offset[0], y1 + offset[1], x2 + offset[0], y2 + offset[1]]
                 vocab_canvas.add_vocab_card(vocab, vocab_bbox, DICTIONARY[vocab])
 
+    return vocab_canvas
+
+def run(manual=False, fullscreen=False):
+    """
+    Capture, OCR and render synchronously on the calling (Tk) thread.
+    Hotkeys go through PIPELINE instead, which runs the OCR off the Tk thread.
+    """
+    to_ocr, offsets, layout_key = capture_regions(manual, fullscreen)
+    render_regions(process_regions(to_ocr, layout_key=layout_key), offsets)
+
 def toggle_save():
-    update_config(('save_data', not CONFIG['save_data']))
+    CONFIG.set(('save_data', not CONFIG['save_data']))
     print(f"Saving OCR data {'on' if CONFIG['save_data'] else 'off'}")
 
 def toggle_verbose():
-    update_config(('verbose', not CONFIG['verbose']))
+    CONFIG.set(('verbose', not CONFIG['verbose']))
     print(f"Verbose mode {'on' if CONFIG['verbose'] else 'off'}")
+    if CONFIG['verbose'] and METRICS.enabled: print(METRICS.report())
 
 def toggle_strict_mode():
-    update_config(('preprocess_image', not CONFIG['preprocess_image']))
+    CONFIG.set(('preprocess_image', not CONFIG['preprocess_image']))
     print(f"Strict mode {'on' if CONFIG['preprocess_image'] else 'off'}")
 
+def toggle_watch():
+    watching = WATCHER.toggle()
+    CONFIG.set(('watch', {**CONFIG['watch'], 'enabled': watching}))
+    print(f"Watch mode {'on' if watching else 'off'}")
+
 if __name__ == "__main__":
-    # Bind the function to hotkey
-    keyboard.add_hotkey(CONFIG['manual_capture_hotkey'], lambda: run(manual=True))
-    keyboard.add_hotkey(CONFIG['fullscreen_capture_hotkey'], lambda: run(fullscreen=True))
-    mouse.on_middle_click(lambda: run(fullscreen=True))
-    keyboard.add_hotkey(CONFIG['colorpick_hotkey'], pick_text_color)
-    keyboard.add_hotkey(CONFIG['toggle_verbose_hotkey'], toggle_verbose)
-    keyboard.add_hotkey(CONFIG['strict_mode_hotkey'], toggle_strict_mode)
+    import keyboard
+    import mouse
+
+    # Start loading the OCR model while the overlay and hotkeys are set up
+    if LOOKUP_CLIENT and same_endpoint(LOOKUP_CLIENT.url, CONFIG['anki']['url']):
+        sys.exit(f"daemon.port {CONFIG['daemon']['port']} is AnkiConnect's (anki.url in config.json), pick another port")
+    if LOOKUP_CLIENT:
+        print(f"Using the lookup server at {LOOKUP_CLIENT.url}" + ("" if LOOKUP_CLIENT.is_ready else " (not running yet, start it with py server.py)"))
+    else:
+        READER.start()
+    # Send any notes left queued while Anki wasn't running, and pull the words already in the deck
+    ANKI.start()
+    ANKI.start_known_refresh()
 
     root = Tk()
     root.attributes('-fullscreen', True, '-topmost', True, '-alpha', 0)
 
-    keyboard.add_hotkey('esc', lambda: clear_canvases(root))
-    mouse.on_right_click(lambda: clear_canvases(root))
+    # Card windows are kept and reused across captures
+    RENDER_BACKEND = TkBackend(root)
+    CARD_POOL = CardPool(RENDER_BACKEND, **CONFIG['card_pool'])
+
+    # Hook callbacks only hand work to the pipeline, which does OCR on its own worker
+    # and touches Tk only from the Tk loop
+    PIPELINE = CapturePipeline(root,
+                               capture=capture_regions,
+                               process=lambda payload, is_current: process_regions(payload[0], is_current, payload[2]),
+                               render=lambda payload, region_results: render_regions(region_results, payload[1]))
+
+    def clear():
+        PIPELINE.cancel()
+        PIPELINE.call_soon(clear_canvases, root)
+
+    # Watch mode OCRs the dialog regions by itself whenever their text changes
+    WATCHER = Watcher(sample_dialog, PIPELINE.submit,
+                      **{k: v for k, v in CONFIG['watch'].items() if k not in ('enabled', 'downsample')})
+    if CONFIG['watch']['enabled']: WATCHER.start()
+
+    def apply_watch_setting(changed):
+        if CONFIG['watch']['enabled'] != WATCHER.running:
+            WATCHER.toggle()
+
+    CONFIG.subscribe(apply_watch_setting, 'watch')
+
+    # Bind the function to hotkey
+    HOTKEY_ACTIONS = {
+        'manual_capture_hotkey': lambda: PIPELINE.submit(manual=True),
+        'fullscreen_capture_hotkey': lambda: PIPELINE.submit(fullscreen=True),
+        'watch_hotkey': toggle_watch,
+        'colorpick_hotkey': lambda: PIPELINE.call_soon(pick_text_color),
+        'toggle_verbose_hotkey': toggle_verbose,
+        'strict_mode_hotkey': toggle_strict_mode,
+    }
+    hotkeys = {}
+
+    def bind_hotkeys(changed=HOTKEY_ACTIONS.keys()):
+        for key in HOTKEY_ACTIONS.keys() & set(changed):
+            if key in hotkeys:
+                keyboard.remove_hotkey(hotkeys[key])
+            hotkeys[key] = keyboard.add_hotkey(CONFIG[key], HOTKEY_ACTIONS[key])
+
+    bind_hotkeys()
+    CONFIG.subscribe(bind_hotkeys, *HOTKEY_ACTIONS)
+    mouse.on_middle_click(lambda: PIPELINE.submit(fullscreen=True))
+
+    keyboard.add_hotkey('esc', clear)
+    mouse.on_right_click(clear)
+
+    # Apply edits made to config.json while running
+    CONFIG.watch()
 
     print("Ready!")
     try:
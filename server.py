@@ -0,0 +1,132 @@
+"""
+Resident lookup server. Keeps the EasyOCR reader and the dictionary loaded so the overlay (with
+daemon.enabled in config.json) and other local tools can share one warm model.
+
+    py server.py                  # listen on daemon.host:daemon.port from config.json
+    py server.py --port 8800 --gpu
+
+Endpoints (JSON responses):
+    POST /ocr       body: an image file (PNG, JPEG, ...) or an .npz of RGB arrays, one per region.
+                    Add ?strict=1 to apply the strict mode color filter first.
+                    -> {"regions": [{"results": [[bbox, text, confidence]], "vocab": [[word, bbox]]}]}
+    POST /lookup    body: {"text": "..."} -> {"matches": [...], "entries": {word: [[traditional, pinyin, english]]}}
+    GET  /stats     queue depth, batch sizes and per-stage latency percentiles
+    GET  /health    {"ready": bool}
+
+OCR requests arriving within daemon.batch_window seconds of each other are OCR'd together in one
+batched call. bboxes are [x1, y1, x2, y2] in each region's own coordinates.
+"""
+import argparse
+import io
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from PIL import Image
+
+import script
+from utils.batcher import DynamicBatcher, QueueFull
+from utils.cpu_inference import cpu_reader_kwargs
+from utils.lookup_client import same_endpoint
+from utils.ocr_reader import BackgroundReader
+
+
+def ocr_regions(images: list) -> list:
+    """
+    OCR a batch of region images (possibly from several clients) in one pass.
+    """
+    results = []
+    for easyocr_results in script.perform_ocr_batch(images):
+        easyocr_results = [([int(v) for v in bbox], text, float(confidence)) for bbox, text, confidence in easyocr_results]
+        results.append({'results': easyocr_results, 'vocab': script.segment_vocab(easyocr_results)})
+    return results
+
+
+def decode_images(body: bytes, content_type: str) -> list[np.ndarray]:
+    if content_type in ('application/x-npz', 'application/octet-stream'):
+        with np.load(io.BytesIO(body), allow_pickle=False) as arrays:
+            return [arrays[name] for name in arrays.files]
+    return [np.asarray(Image.open(io.BytesIO(body)).convert('RGB'))]
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    batcher: DynamicBatcher = None
+    started = time.time()
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/health':
+            self._send(200, {'ready': script.READER.is_ready})
+        elif path == '/stats':
+            self._send(200, {**self.batcher.stats(), 'ready': script.READER.is_ready, 'uptime': time.time() - self.started})
+        else:
+            self._send(404, {'error': f"Unknown path {path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            if url.path == '/ocr':
+                images = decode_images(body, self.headers.get('Content-Type', ''))
+                if parse_qs(url.query).get('strict', ['0'])[0] == '1':
+                    images = [script.strict_preprocess_image(image) for image in images]
+                self._send(200, {'regions': self.batcher.submit(images)})
+            elif url.path == '/lookup':
+                text = json.loads(body)['text']
+                matches = script.find_vocab_matches(text.strip(script.PUNCTUATION))
+                self._send(200, {'matches': matches, 'entries': {word: script.DICTIONARY[word] for word in set(matches) if word}})
+            else:
+                self._send(404, {'error': f"Unknown path {url.path}"})
+        except QueueFull as e:
+            self._send(503, {'error': str(e)})
+        except (ValueError, KeyError, OSError) as e:
+            self._send(400, {'error': f"Bad request: {e}"})
+        except Exception as e:
+            print(f"Error handling {url.path}: {e}")
+            self._send(500, {'error': str(e)})
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if script.CONFIG['verbose']: super().log_message(format, *args)
+
+
+def main(argv=None) -> int:
+    settings = script.CONFIG['daemon']
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=settings['host'])
+    parser.add_argument('--port', type=int, default=settings['port'])
+    parser.add_argument('--gpu', dest='gpu', action='store_true', default=True, help="run the model on GPU if available (default)")
+    parser.add_argument('--cpu', dest='gpu', action='store_false')
+    args = parser.parse_args(argv)
+
+    if same_endpoint(f"http://{args.host}:{args.port}", script.CONFIG['anki']['url']):
+        print(f"Port {args.port} is AnkiConnect's (anki.url in config.json), pick another daemon.port")
+        return 1
+
+    script.READER = BackgroundReader(['ch_sim'], on_ready=script.report_startup, gpu=args.gpu,
+                                     **cpu_reader_kwargs(**script.CONFIG['cpu_inference'])).start()
+    LookupHandler.batcher = DynamicBatcher(ocr_regions, settings['batch_window'], settings['max_batch'], settings['max_queue'])
+
+    server = ThreadingHTTPServer((args.host, args.port), LookupHandler)
+    print(f"Lookup server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,19 @@
+import json
+import os
+import re
+import threading
+import time
+
 import requests
 
+ANKI_CONNECT_URL = 'http://localhost:8765'
+
 def anki_connect(action, params={}):
     return {'action': action, 'version': 6, 'params': params}
 
 def invoke(action, params={}):
     request_json = anki_connect(action, params)
-    response = requests.post('http://localhost:8765', json=request_json)
+    response = requests.post(ANKI_CONNECT_URL, json=request_json)
     if response.status_code != 200:
         print(f"Error {response.status_code}: {response.text}")
     result = response.json()
@@ -13,28 +21,233 @@ def invoke(action, params={}):
         print(f"Error from AnkiConnect: {result['error']}")
     return result['result']
 
-def add_vocabulary_to_anki(anki_config, vocab_entry):
-    deck_name = anki_config['deck_name']
-    model_name = anki_config['model']
-    front = anki_config['front']
-    back = anki_config['back']
-
-    invoke('createDeck', {'deck': deck_name})
-
-    note = {
-        'deckName': deck_name,
-        'modelName': model_name, # "问答题"
-        'fields': {
-            front: vocab_entry['front'], # '正面'
-            back: vocab_entry['back'] # '背面'
-        },
-        'options': {
-            'allowDuplicate': False
-        },
-    }
-
-    invoke('addNote', {'note': note})
-    invoke('sync')
+class AnkiClient:
+    """
+    Long-lived AnkiConnect client.
+
+    Notes passed to add() are appended to an on-disk queue and sent from a background thread.
+    Adds that arrive within batch_window seconds of each other go out in one `multi` request over a
+    pooled session. The deck is created once per session, and `sync` runs once, sync_delay seconds
+    after the last batch. If Anki isn't running the queue stays on disk and is retried every
+    retry_interval seconds, including after a restart.
+
+    The front fields of notes already in the deck are kept in a local set (cached on disk at
+    known_cache_path and refreshed incrementally every known_refresh_interval seconds), so cards
+    can show known words at once and adding them again costs no round-trip.
+    known_words sets how cards of known words are drawn: 'show', 'dim' or 'skip'.
+
+    Settings can be changed while running with configure(); they apply to the next note queued and
+    the next request sent.
+    """
+    def __init__(self, deck_name, model, front, back, url=ANKI_CONNECT_URL, queue_path='saved_data/anki_queue.jsonl',
+                 batch_window=1.0, sync_delay=30.0, retry_interval=30.0, timeout=5.0,
+                 known_words='dim', known_cache_path='saved_data/anki_known.json', known_refresh_interval=300.0):
+        self.configure(deck_name, model, front, back, url, queue_path, batch_window, sync_delay, retry_interval, timeout,
+                       known_words, known_cache_path, known_refresh_interval)
+
+        self._known_notes = self._load_known_cache() # note id -> front text
+        self._known = set(self._known_notes.values())
+        self._added = set() # words queued during this session
+        self._known_thread = None
+
+        self.session = requests.Session()
+        self._created_decks = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sync_due = None
+        self._thread = None
+
+    def configure(self, deck_name, model, front, back, url=ANKI_CONNECT_URL, queue_path='saved_data/anki_queue.jsonl',
+                  batch_window=1.0, sync_delay=30.0, retry_interval=30.0, timeout=5.0,
+                  known_words='dim', known_cache_path='saved_data/anki_known.json', known_refresh_interval=300.0):
+        self.deck_name = deck_name
+        self.model = model
+        self.front = front
+        self.back = back
+        self.url = url
+        self.queue_path = queue_path
+        self.batch_window = batch_window
+        self.sync_delay = sync_delay
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self.known_words = known_words
+        self.known_cache_path = known_cache_path
+        self.known_refresh_interval = known_refresh_interval
+
+    def start(self):
+        """
+        Start the background sender, which also flushes notes left in the queue by a previous run.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name='anki-client', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def start_known_refresh(self):
+        """
+        Start refreshing the known words from Anki in the background.
+        """
+        with self._lock:
+            if self._known_thread is None:
+                self._known_thread = threading.Thread(target=self._known_worker, name='anki-known', daemon=True)
+                self._known_thread.start()
+
+    def is_known(self, word: str) -> bool:
+        return word in self._known or word in self._added
+
+    def _load_known_cache(self) -> dict:
+        if not os.path.exists(self.known_cache_path):
+            return {}
+        try:
+            with open(self.known_cache_path, 'r', encoding='utf-8') as file:
+                return {int(note_id): front for note_id, front in json.load(file).items()}
+        except (OSError, ValueError, AttributeError) as e:
+            # rebuilt by the next refresh
+            print(f"Ignoring unreadable known words cache {self.known_cache_path}: {e}")
+            return {}
+
+    def _save_known_cache(self):
+        os.makedirs(os.path.dirname(self.known_cache_path) or '.', exist_ok=True)
+        tmp_path = self.known_cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self._known_notes, file, ensure_ascii=False)
+        os.replace(tmp_path, self.known_cache_path)
+
+    def refresh_known(self):
+        """
+        Pull front fields of notes added to the deck since the last refresh, and forget deleted ones.
+        """
+        note_ids = set(self.invoke('findNotes', query=f'deck:"{self.deck_name}"'))
+        known_notes = {note_id: front for note_id, front in self._known_notes.items() if note_id in note_ids}
+
+        new_ids = sorted(note_ids - known_notes.keys())
+        for i in range(0, len(new_ids), 500):
+            for info in self.invoke('notesInfo', notes=new_ids[i:i + 500]):
+                if self.front in info.get('fields', {}):
+                    known_notes[info['noteId']] = strip_html(info['fields'][self.front]['value'])
+
+        if known_notes != self._known_notes:
+            self._known_notes = known_notes
+            self._known = set(known_notes.values())
+            self._save_known_cache()
+
+    def _known_worker(self):
+        while True:
+            try:
+                self.refresh_known()
+            except (requests.exceptions.RequestException, RuntimeError):
+                pass # Anki isn't running, keep the cached words
+            time.sleep(self.known_refresh_interval)
+
+    def invoke(self, action, **params):
+        response = self.session.post(self.url, json=anki_connect(action, params), timeout=self.timeout)
+        response.raise_for_status()
+        result = response.json()
+        if result.get('error') is not None:
+            raise RuntimeError(f"AnkiConnect {action}: {result['error']}")
+        return result['result']
+
+    def build_note(self, vocab_entry) -> dict:
+        return {
+            'deckName': self.deck_name,
+            'modelName': self.model, # "问答题"
+            'fields': {
+                self.front: vocab_entry['front'], # '正面'
+                self.back: vocab_entry['back'] # '背面'
+            },
+            'options': {
+                'allowDuplicate': False
+            },
+        }
+
+    def add(self, vocab_entry):
+        """
+        Queue a {'front', 'back'} vocab entry to be added as a note. Returns immediately.
+        Words already in the deck are skipped.
+        """
+        word = strip_html(vocab_entry['front'])
+        if self.is_known(word):
+            return
+        self._added.add(word)
+
+        note = self.build_note(vocab_entry)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.queue_path) or '.', exist_ok=True)
+            with open(self.queue_path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(note, ensure_ascii=False) + '\n')
+        self.start()
+
+    def _read_queue(self) -> list[dict]:
+        if not os.path.exists(self.queue_path):
+            return []
+        with open(self.queue_path, 'r', encoding='utf-8') as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def _remove_from_queue(self, sent: int):
+        """
+        Drop the first `sent` notes from the queue, keeping any added while they were being sent.
+        """
+        with self._lock:
+            remaining = self._read_queue()[sent:]
+            tmp_path = self.queue_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                file.writelines(json.dumps(note, ensure_ascii=False) + '\n' for note in remaining)
+            os.replace(tmp_path, self.queue_path)
+
+    def flush(self) -> bool:
+        """
+        Send every queued note in one batch. Returns False if Anki couldn't be reached.
+        """
+        with self._lock:
+            notes = self._read_queue()
+        if not notes:
+            return True
+
+        try:
+            for deck in {note['deckName'] for note in notes} - self._created_decks:
+                self.invoke('createDeck', deck=deck)
+                self._created_decks.add(deck)
+
+            results = self.invoke('multi', actions=[{'action': 'addNote', 'params': {'note': note}} for note in notes])
+        except requests.exceptions.RequestException:
+            return False
+        except RuntimeError as e:
+            print(e)
+            return False
+
+        for note, result in zip(notes, results):
+            error = result.get('error') if isinstance(result, dict) else None
+            if error and 'duplicate' not in error:
+                print(f"Error from AnkiConnect adding {note['fields'][self.front]}: {error}")
+
+        self._remove_from_queue(len(notes))
+        self._sync_due = time.monotonic() + self.sync_delay
+        return True
+
+    def _sync(self):
+        self._sync_due = None
+        try:
+            self.invoke('sync')
+        except (requests.exceptions.RequestException, RuntimeError) as e:
+            print(f"Anki sync failed: {e}")
+
+    def _worker(self):
+        while True:
+            timeout = None if self._sync_due is None else max(0, self._sync_due - time.monotonic())
+            if self._wake.wait(timeout):
+                # let adds that arrive close together go out in one request
+                time.sleep(self.batch_window)
+                self._wake.clear()
+                if not self.flush():
+                    print(f"Anki isn't reachable, {len(self._read_queue())} notes queued for later")
+                    time.sleep(self.retry_interval)
+                    self._wake.set()
+            elif self._sync_due is not None and time.monotonic() >= self._sync_due:
+                self._sync()
+
+def strip_html(text: str) -> str:
+    return re.sub(r'<[^>]+>', '', text).strip()
 
 def build_vocab_entry_from_VocabCard(vocab_card):
     front = f"<h1>{vocab_card.simplified}</h1>"
@@ -0,0 +1,110 @@
+import queue
+import threading
+import time
+
+from utils.metrics import Metrics
+
+
+class QueueFull(Exception):
+    pass
+
+
+class _Request:
+    def __init__(self, items: list):
+        self.items = items
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class DynamicBatcher:
+    """
+    Collects work submitted from many threads into batches for a single worker.
+
+    The worker takes the oldest waiting request, then keeps taking requests until batch_window seconds
+    have passed or max_batch items are collected, and calls process(items) once for all of them.
+    Under light load a request waits at most batch_window; under heavy load batches fill up at once.
+
+    Latency is recorded per stage ('queue', 'batch', 'request') in a private Metrics instance.
+    """
+    def __init__(self, process, batch_window=0.01, max_batch=8, max_queue=32):
+        self.process = process
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.metrics = Metrics(enabled=True, path=None)
+        self.requests = self.batches = self.batched_items = 0
+        self._queue = queue.Queue(max_queue)
+        threading.Thread(target=self._worker, name='batcher', daemon=True).start()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, items: list, timeout=None) -> list:
+        """
+        Process items as part of the next batch. Blocks until done and returns one result per item.
+        Raises QueueFull if max_queue requests are already waiting.
+        """
+        request = _Request(items)
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            raise QueueFull(f"{self._queue.maxsize} requests already waiting") from None
+
+        if not request.done.wait(timeout):
+            raise TimeoutError("Request was not processed in time")
+        self.metrics.record('request', time.perf_counter() - request.enqueued)
+        if request.error:
+            raise request.error
+        return request.results
+
+    def stats(self) -> dict:
+        return {
+            'queue_depth': self.queue_depth,
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_items / self.batches if self.batches else 0,
+            'stages': self.metrics.snapshot(),
+        }
+
+    def _collect(self) -> list[_Request]:
+        batch = [self._queue.get()]
+        size = len(batch[0].items)
+        deadline = time.perf_counter() + self.batch_window
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.items)
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect()
+            start = time.perf_counter()
+            for request in batch:
+                self.metrics.record('queue', start - request.enqueued)
+
+            items = [item for request in batch for item in request.items]
+            try:
+                results = self.process(items)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+                    request.done.set()
+                continue
+            finally:
+                self.metrics.record('batch', time.perf_counter() - start)
+                self.requests += len(batch)
+                self.batches += 1
+                self.batched_items += len(items)
+
+            for request in batch:
+                request.results, results = results[:len(request.items)], results[len(request.items):]
+                request.done.set()
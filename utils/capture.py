@@ -0,0 +1,60 @@
+import numpy as np
+from PIL import Image
+
+
+class CaptureBackend:
+    """
+    Source of screen pixels.
+
+    grab() takes one screenshot of the union of the requested regions and returns a numpy view
+    per region into that single buffer, so no region is copied. Regions are (x, y, width, height).
+    """
+    def screen_size(self) -> tuple[int, int]:
+        raise NotImplementedError
+
+    def grab_area(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """
+        Return the pixels of one screen area as an RGB(A) uint8 array.
+        """
+        raise NotImplementedError
+
+    def grab(self, regions: list) -> list[np.ndarray]:
+        x1 = min(x for x, _, _, _ in regions)
+        y1 = min(y for _, y, _, _ in regions)
+        x2 = max(x + width for x, _, width, _ in regions)
+        y2 = max(y + height for _, y, _, height in regions)
+
+        frame = self.grab_area(x1, y1, x2 - x1, y2 - y1)
+        return [frame[y - y1:y - y1 + height, x - x1:x - x1 + width] for x, y, width, height in regions]
+
+
+class ScreenBackend(CaptureBackend):
+    """
+    Captures the real screen with pyautogui.
+    """
+    def screen_size(self) -> tuple[int, int]:
+        import pyautogui
+        size = pyautogui.size()
+        return size.width, size.height
+
+    def grab_area(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        import pyautogui
+        return np.asarray(pyautogui.screenshot(region=(x, y, width, height)))
+
+
+class ArrayBackend(CaptureBackend):
+    """
+    Serves captures from a fixed screen-sized image, for running the pipeline headless.
+    """
+    def __init__(self, frame: np.ndarray):
+        self.frame = frame
+
+    @classmethod
+    def from_file(cls, path: str) -> 'ArrayBackend':
+        return cls(np.asarray(Image.open(path).convert('RGB')))
+
+    def screen_size(self) -> tuple[int, int]:
+        return self.frame.shape[1], self.frame.shape[0]
+
+    def grab_area(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        return self.frame[y:y + height, x:x + width]
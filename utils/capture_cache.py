@@ -0,0 +1,97 @@
+import hashlib
+import sys
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+
+class CaptureCache:
+    """
+    LRU cache of per-region results keyed by the content of the captured image.
+
+    Lookups match on an exact hash of the pixels. If perceptual_tolerance > 0, a capture whose
+    difference hash is within that many bits of a cached one is also a hit, which absorbs tiny
+    changes like a blinking cursor (keep it low, different lines of text can hash closely).
+
+    Cached results depend on the settings used to produce them. Call validate() with a fingerprint
+    of those settings before each lookup; the cache is cleared whenever the fingerprint changes.
+    """
+    HASH_SIZE = 16 # difference hash of HASH_SIZE x HASH_SIZE bits
+
+    def __init__(self, max_entries=16, max_bytes=16 * 1024 * 1024, perceptual_tolerance=0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.perceptual_tolerance = perceptual_tolerance
+        self.hits = self.misses = 0
+        self._entries = OrderedDict() # exact hash -> (perceptual hash, size, value)
+        self._size = 0
+        self._fingerprint = None
+
+    def validate(self, fingerprint):
+        if fingerprint != self._fingerprint:
+            self.clear()
+            self._fingerprint = fingerprint
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def key(self, img) -> tuple:
+        """
+        Return (exact hash, perceptual hash) for a PIL image or numpy array.
+        """
+        array = np.asarray(img)
+        exact = hashlib.blake2b(str(array.shape).encode(), digest_size=16)
+        if array.flags.c_contiguous:
+            exact.update(array.data)
+        else:
+            # a region view into a larger screenshot: hash row by row instead of copying it
+            for row in array:
+                exact.update(np.ascontiguousarray(row).data)
+        perceptual = self._difference_hash(array) if self.perceptual_tolerance > 0 else None
+        return exact.digest(), perceptual
+
+    def _difference_hash(self, array: np.ndarray) -> int:
+        gray = Image.fromarray(array).convert('L').resize((self.HASH_SIZE + 1, self.HASH_SIZE), Image.BILINEAR)
+        pixels = np.asarray(gray, dtype=np.int16)
+        bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+        return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+    def get(self, key: tuple):
+        exact, perceptual = key
+        entry = self._entries.get(exact)
+        if entry is None and perceptual is not None:
+            for cached_exact, (cached_perceptual, _, _) in self._entries.items():
+                if bin(perceptual ^ cached_perceptual).count('1') <= self.perceptual_tolerance:
+                    exact, entry = cached_exact, self._entries[cached_exact]
+                    break
+
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(exact)
+        return entry[2]
+
+    def put(self, key: tuple, value):
+        exact, perceptual = key
+        if exact in self._entries:
+            self._size -= self._entries.pop(exact)[1]
+
+        size = _estimate_size(value)
+        self._entries[exact] = (perceptual, size, value)
+        self._size += size
+
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+
+
+def _estimate_size(value) -> int:
+    """
+    Rough recursive size of nested lists/tuples/strings/numbers, good enough for a byte budget.
+    """
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(item) for item in value)
+    return sys.getsizeof(value)
@@ -1,79 +1,155 @@
-#A parser for the CC-Cedict. Convert the Chinese-English dictionary into a list of python dictionaries with "traditional","simplified", "pinyin", and "english" keys.
+#A parser for the CC-Cedict. Convert the Chinese-English dictionary into the compiled lookup artifact used by script.py
+#(see utils/compiled_dictionary.py), and optionally into a JSON list of dictionaries with "traditional","simplified", "pinyin", and "english" keys.
 
-#Make sure that the cedict_ts.u8 file is in the same folder as this file, and that the name matches the file name on line 13.
+#Run from the repository root:
+#   py -m utils.cc_cedict_parser path/to/cedict_ts.u8
+#Comment lines (the copyright header) are skipped, so the file can be used as downloaded.
 
-#Before starting, open the CEDICT text file and delete the copyright information at the top. Otherwise the program will try to parse it and you will get an error message.
+#The source is streamed and parsed on a process pool. Parsed lines are cached next to the output, so rebuilding after a
+#new CEDICT release only parses the lines that changed.
 
-#Characters that are commonly used as surnames have two entries in CC-CEDICT. This program will remove the surname entry if there is another entry for the character. If you want to include the surnames, simply delete lines 59 and 60.
+#Characters that are commonly used as surnames have two entries in CC-CEDICT. Pass --remove-surnames to remove the surname entry if there is another entry for the character.
 
 #This code was written by Franki Allegra in February 2020.
 
-#open CEDICT file
+import argparse
 import json
-from convert_pinyin import convertPinyin
+import os
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
 
-with open('cedict_ts.u8', 'r', encoding='utf-8') as file:
-    text = file.read()
-    lines = text.split('\n')
-    dict_lines = list(lines)
+from utils.compiled_dictionary import compile_dictionary, group_entries
+from utils.convert_pinyin import convertPinyin
+
+CHUNK_SIZE = 2000
 
 #define functions
 
-    def parse_line(line):
-        parsed = {}
-        if line == '':
-            dict_lines.remove(line)
-            return 0
-        line = line.rstrip('/')
-        line = line.split('/')
-        if len(line) <= 1:
-            return 0
-        english = line[1]
-        char_and_pinyin = line[0].split('[')
-        characters = char_and_pinyin[0]
-        characters = characters.split()
-        traditional = characters[0]
-        simplified = characters[1]
-        pinyin = char_and_pinyin[1]
-        pinyin = pinyin.rstrip()
-        pinyin = pinyin.rstrip("]")
-        parsed['traditional'] = traditional
-        parsed['simplified'] = simplified
-        parsed['pinyin'] = convertPinyin(pinyin)
-        parsed['english'] = convertPinyin(english)
-        list_of_dicts.append(parsed)
-
-    def remove_surnames():
-        for x in range(len(list_of_dicts)-1, -1, -1):
-            if "surname " in list_of_dicts[x]['english']:
-                if list_of_dicts[x]['traditional'] == list_of_dicts[x+1]['traditional']:
-                    list_of_dicts.pop(x)
-            
-    def main():
-
-        #make each line into a dictionary
-        print("Parsing dictionary . . .")
-        for line in dict_lines:
-                parse_line(line)
-        
-        #remove entries for surnames from the data (optional):
-
-        # print("Removing Surnames . . .")
-        # remove_surnames()
-
-        with open('sim_cn_dictionary.json', 'w') as file:
+def parse_line(line):
+    line = line.rstrip('\n')
+    if line == '' or line.startswith('#'):
+        return None
+    line = line.rstrip('/')
+    line = line.split('/')
+    if len(line) <= 1:
+        return None
+    english = line[1]
+    char_and_pinyin = line[0].split('[')
+    characters = char_and_pinyin[0]
+    characters = characters.split()
+    traditional = characters[0]
+    simplified = characters[1]
+    pinyin = char_and_pinyin[1]
+    pinyin = pinyin.rstrip()
+    pinyin = pinyin.rstrip("]")
+    return {
+        'traditional': traditional,
+        'simplified': simplified,
+        'pinyin': convertPinyin(pinyin),
+        'english': convertPinyin(english),
+    }
+
+def parse_chunk(lines):
+    return [parse_line(line) for line in lines]
+
+def iter_chunks(path, size=CHUNK_SIZE):
+    with open(path, 'r', encoding='utf-8') as file:
+        while True:
+            chunk = list(islice(file, size))
+            if not chunk:
+                return
+            yield chunk
+
+def load_parse_cache(cache_path):
+    if not os.path.exists(cache_path):
+        return {}
+    with open(cache_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def save_parse_cache(cache_path, cache):
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(cache, file, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+def parse_cedict(path, cache=None, workers=None):
+    """
+    Parse the CEDICT file into a list of entry dicts, in source order.
+
+    Lines found in `cache` ({line: entry or None}) are reused; only the others are sent to the
+    process pool. Returns (list_of_dicts, new_cache, number of lines parsed).
+    """
+    cache = cache or {}
+    new_cache = {}
+    list_of_dicts = []
+    parsed = 0
+    chunks = deque() # lines of each chunk handed to the pool, in order
+
+    def uncached_lines():
+        nonlocal parsed
+        for chunk in iter_chunks(path):
+            lines = [line.rstrip('\n') for line in chunk]
+            todo = [line for line in lines if line not in cache]
+            parsed += len(todo)
+            chunks.append((lines, todo))
+            yield todo
+
+    with Pool(workers) as pool:
+        # imap yields results in order, and only after consuming the chunk they belong to
+        for entries in pool.imap(parse_chunk, uncached_lines()):
+            lines, todo = chunks.popleft()
+            fresh = dict(zip(todo, entries))
+            for line in lines:
+                entry = cache[line] if line in cache else fresh[line]
+                new_cache[line] = entry
+                if entry is not None:
+                    list_of_dicts.append(entry)
+
+    return list_of_dicts, new_cache, parsed
+
+def remove_surnames(list_of_dicts):
+    for x in range(len(list_of_dicts)-2, -1, -1):
+        if "surname " in list_of_dicts[x]['english']:
+            if list_of_dicts[x]['traditional'] == list_of_dicts[x+1]['traditional']:
+                list_of_dicts.pop(x)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile CC-CEDICT into the dictionary used by script.py")
+    parser.add_argument('source', nargs='?', default='cedict_ts.u8')
+    parser.add_argument('-o', '--output', default='utils/sim_cn_dictionary.bin')
+    parser.add_argument('--json', help="also write the entries as JSON to this path")
+    parser.add_argument('--workers', type=int, default=None, help="parser processes (default: one per core)")
+    parser.add_argument('--full', action='store_true', help="ignore the cache from the previous build")
+    parser.add_argument('--remove-surnames', action='store_true')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    cache_path = args.output + '.parsecache'
+    cache = {} if args.full else load_parse_cache(cache_path)
+
+    #make each line into a dictionary
+    print("Parsing dictionary . . .")
+    list_of_dicts, new_cache, parsed = parse_cedict(args.source, cache, args.workers)
+    removed = len(cache.keys() - new_cache.keys())
+    print(f"{len(list_of_dicts)} entries: {parsed} lines parsed, {removed} lines removed since the last build")
+
+    #remove entries for surnames from the data (optional):
+    if args.remove_surnames:
+        print("Removing Surnames . . .")
+        remove_surnames(list_of_dicts)
+
+    print("Compiling . . .")
+    compile_dictionary(group_entries(list_of_dicts), args.output)
+    save_parse_cache(cache_path, new_cache)
+
+    if args.json:
+        with open(args.json, 'w') as file:
             json.dump(list_of_dicts, file)
 
-        return list_of_dicts
-
-
-        #If you want to save to a database as JSON objects, create a class Word in the Models file of your Django project:
-
-        # print("Saving to database (this may take a few minutes) . . .")
-        # for one_dict in list_of_dicts:
-        #     new_word = Word(traditional = one_dict["traditional"], simplified = one_dict["simplified"], english = one_dict["english"], pinyin = one_dict["pinyin"], hsk = one_dict["hsk"])
-        #     new_word.save()
-        print('Done!')
+    print(f"Done! Wrote {args.output} in {time.perf_counter() - start:.1f}s")
+    return list_of_dicts
 
-list_of_dicts = []
-parsed_dict = main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
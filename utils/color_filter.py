@@ -0,0 +1,91 @@
+import numpy as np
+
+METRICS = ('rgb', 'lab')
+
+
+class ColorFilter:
+    """
+    Precompiled text color filter for strict mode.
+
+    Every 24-bit color is classified once into a lookup table when the filter is built, so masking
+    an image is a single table lookup per pixel no matter how many colors are allowed.
+
+    Metrics:
+        rgb: a color matches if every channel is within `tolerance` of an allowed color.
+        lab: a color matches if its CIE76 distance in Lab space is within `tolerance`. Candidates are
+            searched within LAB_SEARCH_RADIUS times the tolerance per RGB channel.
+    """
+    LAB_SEARCH_RADIUS = 3
+
+    def __init__(self, colors: list, tolerance: int = 10, metric: str = 'rgb'):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown color metric '{metric}', expected one of {METRICS}")
+        self.colors = [tuple(color[:3]) for color in colors]
+        self.tolerance = tolerance
+        self.metric = metric
+
+        # indexed [b, g, r] so a little-endian packed RGBA pixel (& 0xFFFFFF) is the flat index
+        lut = np.zeros((256, 256, 256), dtype=bool)
+        for color in self.colors:
+            if metric == 'rgb':
+                self._add_box(lut, color)
+            else:
+                self._add_lab(lut, color)
+        self._lut = lut.reshape(-1)
+
+    def _add_box(self, lut: np.ndarray, color: tuple):
+        t = self.tolerance
+        r, g, b = color
+        lut[max(0, b - t):b + t + 1, max(0, g - t):g + t + 1, max(0, r - t):r + t + 1] = True
+
+    def _add_lab(self, lut: np.ndarray, color: tuple):
+        radius = min(255, self.tolerance * self.LAB_SEARCH_RADIUS)
+        ranges = [np.arange(max(0, c - radius), min(255, c + radius) + 1) for c in color]
+        r, g, b = np.meshgrid(*ranges, indexing='ij')
+        candidates = np.stack([r, g, b], axis=-1).reshape(-1, 3)
+
+        distance = np.linalg.norm(_rgb_to_lab(candidates) - _rgb_to_lab(np.array([color])), axis=1)
+        matched = candidates[distance <= self.tolerance]
+        lut[matched[:, 2], matched[:, 1], matched[:, 0]] = True
+
+    def matches(self, colors: list, tolerance: int, metric: str) -> bool:
+        """
+        Whether this filter was built for the given settings.
+        """
+        return self.colors == [tuple(color[:3]) for color in colors] and \
+            self.tolerance == tolerance and self.metric == metric
+
+    def mask(self, image: np.ndarray) -> np.ndarray:
+        """
+        Return a boolean (height, width) mask of the pixels of an RGB or RGBA image that match.
+        """
+        import cv2
+
+        # views with row padding (e.g. regions of a larger screenshot) are handled without copying
+        rgba = cv2.cvtColor(image, cv2.COLOR_RGB2RGBA) if image.shape[2] == 3 else image
+        packed = rgba.view('<u4')[..., 0] & 0xFFFFFF
+        return self._lut[packed]
+
+    def apply(self, image: np.ndarray) -> np.ndarray:
+        """
+        Return a copy of the image's RGB channels with every non-matching pixel set to black.
+        """
+        import cv2
+
+        masked = cv2.bitwise_and(image, image, mask=self.mask(image).view(np.uint8))
+        return cv2.cvtColor(masked, cv2.COLOR_RGBA2RGB) if image.shape[2] == 4 else masked
+
+
+def _rgb_to_lab(colors: np.ndarray) -> np.ndarray:
+    """
+    Convert an (n, 3) array of 8-bit sRGB colors to CIE Lab (D65).
+    """
+    rgb = colors.astype(np.float64) / 255
+    linear = np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
+    xyz = linear @ np.array([[0.4124564, 0.2126729, 0.0193339],
+                             [0.3575761, 0.7151522, 0.1191920],
+                             [0.1804375, 0.0721750, 0.9503041]])
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])], axis=1)
@@ -0,0 +1,227 @@
+"""
+Compile the Chinese-English dictionary into a single binary artifact and read it back through mmap.
+
+Layout (little-endian uint32 unless noted):
+    header      magic, version, n_strings, n_keys, n_nodes, n_edges, n_entries, allow_list string id
+    strings     offset array [n_strings + 1] into the string blob
+    nodes       [n_nodes * 4] edge_start, edge_count, entry_start, entry_count (node 0 is the root)
+    edge_chars  [n_edges] codepoints, sorted within each node
+    edge_nodes  [n_edges] child node index for each edge
+    entries     [n_entries * 3] string ids of (traditional, pinyin, english)
+    blob        utf-8 bytes of every interned string
+
+The key index is the trie from utils.trie flattened into the node/edge arrays, so a lookup
+and a longest-match walk are both a handful of binary searches over the mapped file.
+Nothing is decoded until an entry is actually looked up.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from utils.trie import VocabTrie
+
+MAGIC = b'OCRDICT\x00'
+VERSION = 1
+HEADER = struct.Struct('<8s7I')
+
+
+def group_entries(list_of_dicts) -> dict:
+    """
+    Group CC-CEDICT entries by simplified form, keeping source order.
+    Returns {simplified: [(traditional, pinyin, english), ...]}
+    """
+    grouped = {}
+    for entry in list_of_dicts:
+        grouped.setdefault(entry['simplified'], []).append((entry['traditional'], entry['pinyin'], entry['english']))
+    return grouped
+
+
+def compile_dictionary(grouped: dict, out_path: str):
+    """
+    Write the {simplified: [(traditional, pinyin, english), ...]} mapping to out_path.
+    """
+    strings = {}
+    def intern(s):
+        if s not in strings:
+            strings[s] = len(strings)
+        return strings[s]
+
+    allow_list_sid = intern(''.join(sorted(set(''.join(grouped.keys())))))
+
+    trie = VocabTrie(grouped.keys())
+    nodes, edge_chars, edge_nodes, entries = array('I'), array('I'), array('I'), array('I')
+
+    # breadth-first so each node's children get consecutive indices
+    queue = [trie.root]
+    head = 0
+    while head < len(queue):
+        node = queue[head]
+        head += 1
+
+        children = sorted(char for char in node if char != VocabTrie.END)
+        nodes.extend((len(edge_chars), len(children), len(entries) // 3, 0))
+        for char in children:
+            edge_chars.append(ord(char))
+            edge_nodes.append(len(queue))
+            queue.append(node[char])
+
+        if VocabTrie.END in node:
+            word_entries = grouped[node[VocabTrie.END]]
+            nodes[-1] = len(word_entries)
+            for traditional, pinyin, english in word_entries:
+                entries.extend((intern(traditional), intern(pinyin), intern(english)))
+
+    blob = bytearray()
+    offsets = array('I', [0])
+    for s in strings: # dicts keep insertion order, which matches the string ids
+        blob += s.encode('utf-8')
+        offsets.append(len(blob))
+
+    sections = [offsets, nodes, edge_chars, edge_nodes, entries]
+    if sys.byteorder != 'little':
+        for section in sections:
+            section.byteswap()
+
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(strings), len(grouped), len(queue),
+                               len(edge_chars), len(entries) // 3, allow_list_sid))
+        for section in sections:
+            section.tofile(file)
+        file.write(blob)
+    os.replace(tmp_path, out_path)
+
+
+def compile_dictionary_json(json_path: str, out_path: str):
+    with open(json_path, 'r', encoding='utf-8') as file:
+        grouped = group_entries(json.load(file))
+    compile_dictionary(grouped, out_path)
+
+
+class CompiledDictionary:
+    """
+    Read-only, memory-mapped view of a compiled dictionary.
+
+    Supports `word in d`, `d[word]`, `d.get(word)`, iteration over keys, and the same
+    `longest_match`/`longest_matches` interface as VocabTrie.
+    """
+    def __init__(self, path: str):
+        if sys.byteorder != 'little':
+            raise RuntimeError("CompiledDictionary requires a little-endian host")
+
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n_strings, n_keys, n_nodes, n_edges, n_entries, allow_list_sid = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a compiled dictionary (version {VERSION})")
+        self._n_keys = n_keys
+
+        view = memoryview(self._mmap)
+        pos = HEADER.size
+        def take(count):
+            nonlocal pos
+            section = view[pos:pos + count * 4].cast('I')
+            pos += count * 4
+            return section
+
+        self._offsets = take(n_strings + 1)
+        self._nodes = take(n_nodes * 4)
+        self._edge_chars = take(n_edges)
+        self._edge_nodes = take(n_edges)
+        self._entries = take(n_entries * 3)
+        self._blob = view[pos:]
+
+        self.allow_list = self._string(allow_list_sid)
+
+    def _string(self, sid: int) -> str:
+        return str(self._blob[self._offsets[sid]:self._offsets[sid + 1]], 'utf-8')
+
+    def _child(self, node: int, char: str):
+        start = self._nodes[node * 4]
+        end = start + self._nodes[node * 4 + 1]
+        code = ord(char)
+        i = bisect_left(self._edge_chars, code, start, end)
+        if i < end and self._edge_chars[i] == code:
+            return self._edge_nodes[i]
+        return None
+
+    def _find(self, word: str):
+        node = 0
+        for char in word:
+            node = self._child(node, char)
+            if node is None:
+                return None
+        return node
+
+    def _node_entries(self, node: int) -> list:
+        start = self._nodes[node * 4 + 2] * 3
+        count = self._nodes[node * 4 + 3]
+        entries = self._entries
+        return [(self._string(entries[i]), self._string(entries[i + 1]), self._string(entries[i + 2]))
+                for i in range(start, start + count * 3, 3)]
+
+    def __contains__(self, word: str) -> bool:
+        node = self._find(word) if word else None
+        return node is not None and self._nodes[node * 4 + 3] > 0
+
+    def get(self, word: str, default=None):
+        node = self._find(word) if word else None
+        if node is None or self._nodes[node * 4 + 3] == 0:
+            return default
+        return self._node_entries(node)
+
+    def __getitem__(self, word: str) -> list:
+        entries = self.get(word)
+        if entries is None:
+            raise KeyError(word)
+        return entries
+
+    def __len__(self) -> int:
+        return self._n_keys
+
+    def __iter__(self):
+        # depth-first over the trie, yielding every word in codepoint order
+        stack = [(0, '')]
+        while stack:
+            node, prefix = stack.pop()
+            if prefix and self._nodes[node * 4 + 3] > 0:
+                yield prefix
+            start = self._nodes[node * 4]
+            for i in range(start + self._nodes[node * 4 + 1] - 1, start - 1, -1):
+                stack.append((self._edge_nodes[i], prefix + chr(self._edge_chars[i])))
+
+    def keys(self):
+        return iter(self)
+
+    def longest_match(self, text: str, start: int = 0):
+        """
+        Return the longest word that starts at text[start], or None.
+        """
+        node = 0
+        end = None
+        for i in range(start, len(text)):
+            node = self._child(node, text[i])
+            if node is None:
+                break
+            if self._nodes[node * 4 + 3] > 0:
+                end = i + 1
+        return text[start:end] if end else None
+
+    def longest_matches(self, text: str) -> list:
+        """
+        Return a list of len(text) with the longest word starting at each position (or None).
+        """
+        return [self.longest_match(text, i) for i in range(len(text))]
+
+
+if __name__ == "__main__":
+    # py -m utils.compiled_dictionary [utils/sim_cn_dictionary.json] [utils/sim_cn_dictionary.bin]
+    json_path = sys.argv[1] if len(sys.argv) > 1 else 'utils/sim_cn_dictionary.json'
+    out_path = sys.argv[2] if len(sys.argv) > 2 else 'utils/sim_cn_dictionary.bin'
+    compile_dictionary_json(json_path, out_path)
+    print(f"Compiled {json_path} -> {out_path}")
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import time
+
+
+class ConfigStore(dict):
+    """
+    config.json, loaded once and kept in memory.
+
+    Reads are plain dict lookups. Assigning a key overrides it in memory only (for a single run) and
+    is never written out; set() also saves it to disk, debounced so a burst of changes is written
+    once, atomically (temp file + rename). The file keeps the values last loaded or set() for every
+    other key.
+
+    Whenever a key changes, in code or through an edit to the file picked up by reload_if_changed(),
+    its revision number goes up and the subscribers to that key are called with the set of changed keys.
+    Derived state (color filters, caches, hotkeys) can subscribe or compare revision() tuples to
+    rebuild only when its own keys change. Nested values must be replaced, not mutated in place.
+    """
+    def __init__(self, path='config.json', debounce=0.5):
+        self.path = path
+        self.debounce = debounce
+        self._lock = threading.RLock()
+        self._revisions = {}
+        self._subscribers = [] # (keys, callback)
+        self._timer = None
+        with open(path, 'r', encoding='utf-8') as file:
+            self._saved = json.load(file) # what the file holds, without in-memory overrides
+        super().update(self._saved)
+        self._stat = self._file_stat()
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            if key in self and self[key] == value:
+                return
+            super().__setitem__(key, value)
+            self._revisions[key] = self._revisions.get(key, 0) + 1
+        self._notify({key})
+
+    def set(self, *pairs):
+        """
+        Change (key, value) pairs and save them to disk after the debounce delay.
+        Raises KeyError for keys that are not in the config.
+        """
+        for key, _ in pairs:
+            if key not in self:
+                raise KeyError(f"Unknown config key {key!r}")
+        with self._lock:
+            for key, value in pairs:
+                self._saved[key] = value
+        for key, value in pairs:
+            self[key] = value
+        self._schedule_save()
+
+    def revision(self, *keys) -> tuple:
+        """
+        Return a fingerprint of keys that changes whenever any of their values does.
+        """
+        return tuple(self._revisions.get(key, 0) for key in keys)
+
+    def subscribe(self, callback, *keys):
+        """
+        Call callback(changed_keys) after any of keys changes. Subscribers run on the thread that made
+        the change (the file watcher thread for external edits).
+        """
+        self._subscribers.append((set(keys), callback))
+
+    def _notify(self, changed: set):
+        for keys, callback in list(self._subscribers):
+            if keys & changed:
+                try:
+                    callback(changed)
+                except Exception as e:
+                    print(f"Error applying config change: {e}")
+
+    def _schedule_save(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """
+        Write the config to disk now if a save is pending.
+        """
+        with self._lock:
+            if self._timer is None:
+                return
+            self._timer.cancel()
+            self._timer = None
+
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self._saved, file, indent=4)
+            os.replace(tmp_path, self.path)
+            self._stat = self._file_stat()
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the file if it was modified by something else since it was last read or written.
+        Costs one stat() when it wasn't. Returns whether anything changed.
+        """
+        stat = self._file_stat()
+        if stat == self._stat:
+            return False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                loaded = json.load(file)
+        except (OSError, ValueError) as e:
+            # most likely saved halfway through an edit; try again on the next change
+            self._stat = stat
+            print(f"Could not reload {self.path}: {e}")
+            return False
+
+        with self._lock:
+            self._stat = stat
+            # only keys edited in the file, so in-memory overrides of other keys survive
+            changed = {key for key, value in loaded.items() if self._saved.get(key) != value}
+            self._saved = loaded
+            changed = {key for key in changed if self.get(key) != loaded[key]}
+            for key in changed:
+                super().__setitem__(key, loaded[key])
+                self._revisions[key] = self._revisions.get(key, 0) + 1
+        if changed:
+            print(f"Reloaded {', '.join(sorted(changed))} from {self.path}")
+            self._notify(changed)
+        return bool(changed)
+
+    def watch(self, interval=1.0):
+        """
+        Check for edits to the file every interval seconds on a background thread.
+        """
+        def run():
+            while True:
+                time.sleep(interval)
+                self.reload_if_changed()
+
+        threading.Thread(target=run, name='config-watch', daemon=True).start()
+
+    def _file_stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,34 @@
+def configure_threads(intra_op_threads=0, inter_op_threads=0):
+    """
+    Set torch's CPU thread pools. 0 keeps torch's default (one intra-op thread per core).
+    """
+    import torch
+
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError:
+            # can only be set once, before any inter-op parallel work has started
+            print("Inter-op threads already in use, keeping their current number")
+
+
+def optimize_for_cpu(reader, intra_op_threads=0, inter_op_threads=0):
+    """
+    Set the thread budget of an easyocr.Reader running on CPU. Does nothing for readers on a GPU.
+    """
+    if reader.device != 'cpu':
+        return
+    configure_threads(intra_op_threads, inter_op_threads)
+
+
+def cpu_reader_kwargs(intra_op_threads=0, inter_op_threads=0, quantize=True) -> dict:
+    """
+    BackgroundReader keyword arguments for the cpu_inference settings in config.json.
+
+    On CPU, easyocr.Reader dynamically quantizes the recognizer's LSTM and Linear layers to int8
+    itself when quantize is set; the prepare hook applies the thread budget after load.
+    """
+    return {'quantize': quantize,
+            'prepare': lambda reader: optimize_for_cpu(reader, intra_op_threads, inter_op_threads)}
@@ -0,0 +1,100 @@
+import numpy as np
+
+
+def ink_bands(mask: np.ndarray, min_gap: int = 3) -> list[tuple[int, int, int, int]]:
+    """
+    Find horizontal bands of text in a boolean mask from its row projection.
+
+    Returns:
+        list[tuple[int, int, int, int]]: (y1, y2, x1, x2) of each band, with the band's horizontal ink extent.
+    """
+    rows = np.flatnonzero(mask.any(axis=1))
+    if len(rows) == 0:
+        return []
+
+    # split wherever more than min_gap empty rows separate inked rows
+    breaks = np.flatnonzero(np.diff(rows) > min_gap)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]])) + 1
+
+    bands = []
+    for y1, y2 in zip(starts, ends):
+        columns = np.flatnonzero(mask[y1:y2].any(axis=0))
+        bands.append((int(y1), int(y2), int(columns[0]), int(columns[-1]) + 1))
+    return bands
+
+
+class LayoutCache:
+    """
+    Detected text line boxes per fixed capture region, reused while the text layout is stable.
+
+    A layout counts as stable if the strict mode mask has the same number of text bands at the same
+    rows (within row_tolerance px), and each band's ink lies inside the cached boxes for that band
+    (within margin px). A longer line or an extra line fails the check, so detection runs again.
+    A shorter line fits; its boxes are clipped to the line's ink (plus margin) so recognition, and the
+    character boxes split from its result, don't span the old line's width.
+
+    Like CaptureCache, call validate() with a fingerprint of the color settings before each lookup.
+    """
+    def __init__(self, row_tolerance=4, margin=8):
+        self.row_tolerance = row_tolerance
+        self.margin = margin
+        self.hits = self.misses = 0
+        self._layouts = {} # key -> (bands, horizontal_list)
+        self._fingerprint = None
+
+    def validate(self, fingerprint):
+        if fingerprint != self._fingerprint:
+            self.clear()
+            self._fingerprint = fingerprint
+
+    def lookup(self, key, mask: np.ndarray):
+        """
+        Return the cached easyocr horizontal_list for key if the mask still fits it, else None.
+        """
+        if key not in self._layouts:
+            self.misses += 1
+            return None
+
+        cached_bands, horizontal_list = self._layouts[key]
+        bands = ink_bands(mask)
+        if not bands or not self._fits(bands, cached_bands, horizontal_list):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._clip(bands, horizontal_list)
+
+    def store(self, key, mask: np.ndarray, horizontal_list: list):
+        self._layouts[key] = (ink_bands(mask), horizontal_list)
+
+    def clear(self):
+        self._layouts.clear()
+
+    def _clip(self, bands, horizontal_list) -> list:
+        m = self.margin
+        clipped = []
+        for box in horizontal_list:
+            x_min, x_max, y_min, y_max = box
+            for y1, y2, x1, x2 in bands:
+                if y_min - m <= y1 and y2 <= y_max + m:
+                    x_min, x_max = max(x_min, x1 - m), min(x_max, x2 + m)
+                    break
+            if x_max > x_min:
+                clipped.append([x_min, x_max, y_min, y_max])
+        return clipped
+
+    def _fits(self, bands, cached_bands, horizontal_list) -> bool:
+        if len(bands) != len(cached_bands):
+            return False
+
+        t, m = self.row_tolerance, self.margin
+        for (y1, y2, x1, x2), (cached_y1, cached_y2, _, _) in zip(bands, cached_bands):
+            if abs(y1 - cached_y1) > t or abs(y2 - cached_y2) > t:
+                return False
+
+            # horizontal_list boxes are [x_min, x_max, y_min, y_max]
+            boxes = [box for box in horizontal_list if box[2] - m <= y1 and y2 <= box[3] + m]
+            if not boxes or x1 < min(box[0] for box in boxes) - m or x2 > max(box[1] for box in boxes) + m:
+                return False
+        return True
@@ -0,0 +1,66 @@
+import io
+from urllib.parse import urlparse
+
+import numpy as np
+import requests
+
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1', '0.0.0.0')
+
+
+def same_endpoint(url_a: str, url_b: str) -> bool:
+    """
+    Whether two http URLs point at the same port on the same host (all local addresses count as one).
+    """
+    a, b = urlparse(url_a), urlparse(url_b)
+    host_a, host_b = [host if host not in LOCAL_HOSTS else 'localhost' for host in (a.hostname, b.hostname)]
+    return host_a == host_b and (a.port or 80) == (b.port or 80)
+
+
+class LookupClient:
+    """
+    Client for server.py, which keeps the OCR model loaded for several processes to share.
+
+    Region images are sent uncompressed as one .npz per call; the server batches concurrent
+    calls together.
+    """
+    def __init__(self, url='http://127.0.0.1:8766', timeout=30):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    @property
+    def is_ready(self) -> bool:
+        try:
+            return self._session.get(f"{self.url}/health", timeout=1).json()['ready']
+        except (requests.RequestException, ValueError, KeyError):
+            return False
+
+    def ocr(self, images: list, strict=False) -> list[list[tuple[list[int], str, float]]]:
+        """
+        OCR the region images on the server. Returns the easyocr results per region, like perform_ocr_batch.
+        """
+        buffer = io.BytesIO()
+        np.savez(buffer, *[np.asarray(image) for image in images])
+        response = self._post('/ocr', params={'strict': int(strict)}, data=buffer.getvalue(),
+                              headers={'Content-Type': 'application/x-npz'})
+        return [[(bbox, text, confidence) for bbox, text, confidence in region['results']] for region in response['regions']]
+
+    def lookup(self, text: str) -> dict:
+        return self._post('/lookup', json={'text': text})
+
+    def stats(self) -> dict:
+        return self._request('GET', '/stats')
+
+    def _post(self, path: str, **kwargs) -> dict:
+        return self._request('POST', path, **kwargs)
+
+    def _request(self, method: str, path: str, **kwargs) -> dict:
+        try:
+            response = self._session.request(method, f"{self.url}{path}", timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise RuntimeError(f"Lookup server not reachable at {self.url}: {e}") from e
+        payload = response.json()
+        if response.status_code != 200:
+            raise RuntimeError(f"Lookup server error: {payload.get('error', response.status_code)}")
+        return payload
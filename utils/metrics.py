@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+
+class StageTimer:
+    def __init__(self, metrics, stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.stage, time.perf_counter() - self.start)
+
+
+class Metrics:
+    """
+    Per-stage latency metrics for the capture pipeline.
+
+    Each stage keeps a rolling window of recent durations (for percentiles) and a cumulative histogram
+    of power-of-two millisecond buckets. Snapshots are appended to a JSONL file every flush_interval
+    seconds, on a short-lived background thread so recording never waits on the disk. While disabled, stage() returns a shared no-op context manager and record() returns at once.
+    """
+    BUCKETS_MS = [2 ** i for i in range(15)] # 1ms .. ~16s, plus an overflow bucket
+
+    _disabled = nullcontext()
+
+    def __init__(self, enabled=False, path='saved_data/metrics.jsonl', flush_interval=10.0, window=256):
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self.configure(enabled, path, flush_interval, window)
+
+    def configure(self, enabled=False, path='saved_data/metrics.jsonl', flush_interval=10.0, window=256):
+        with self._lock:
+            self.enabled = enabled
+            self.path = path
+            self.flush_interval = flush_interval
+            self.window = window
+            self._recent = {}
+            self._histograms = {}
+            self._last_flush = time.monotonic()
+
+    def stage(self, name: str):
+        """
+        Context manager that records how long its block took under the given stage name.
+        """
+        if not self.enabled:
+            return self._disabled
+        return StageTimer(self, name)
+
+    def record(self, stage: str, seconds: float):
+        if not self.enabled:
+            return
+
+        ms = seconds * 1000
+        bucket = next((i for i, limit in enumerate(self.BUCKETS_MS) if ms <= limit), len(self.BUCKETS_MS))
+        with self._lock:
+            if stage not in self._recent:
+                self._recent[stage] = deque(maxlen=self.window)
+                self._histograms[stage] = [0] * (len(self.BUCKETS_MS) + 1)
+            self._recent[stage].append(ms)
+            self._histograms[stage][bucket] += 1
+
+            flush_due = self.path and time.monotonic() - self._last_flush >= self.flush_interval
+            if flush_due:
+                self._last_flush = time.monotonic()
+        if flush_due:
+            threading.Thread(target=self.flush, name='metrics-flush', daemon=True).start()
+
+    def snapshot(self) -> dict:
+        """
+        Return {stage: {count, mean_ms, p50_ms, p90_ms, p99_ms, histogram}} over the rolling windows.
+        """
+        with self._lock:
+            recent = {stage: sorted(values) for stage, values in self._recent.items()}
+            histograms = {stage: list(counts) for stage, counts in self._histograms.items()}
+
+        snapshot = {}
+        for stage, values in recent.items():
+            snapshot[stage] = {
+                'count': sum(histograms[stage]),
+                'mean_ms': sum(values) / len(values),
+                'p50_ms': values[int(0.50 * (len(values) - 1))],
+                'p90_ms': values[int(0.90 * (len(values) - 1))],
+                'p99_ms': values[int(0.99 * (len(values) - 1))],
+                'histogram': histograms[stage],
+            }
+        return snapshot
+
+    def flush(self):
+        with self._lock:
+            self._last_flush = time.monotonic()
+            path = self.path
+        snapshot = self.snapshot()
+        if not snapshot or not path:
+            return
+
+        with self._file_lock:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps({'time': time.time(), 'buckets_ms': self.BUCKETS_MS, 'stages': snapshot}) + '\n')
+
+    def report(self) -> str:
+        lines = [f"{'stage':<14}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"]
+        for stage, stats in self.snapshot().items():
+            lines.append(f"{stage:<14}{stats['count']:>8}{stats['mean_ms']:>10.1f}"
+                         f"{stats['p50_ms']:>10.1f}{stats['p90_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+        return '\n'.join(lines)
+
+
+# Shared instance, configured from config.json by script.py
+METRICS = Metrics()
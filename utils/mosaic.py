@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def stack_regions(images: list, gap: int = 32) -> tuple[np.ndarray, list[int]]:
+    """
+    Stack region images vertically on a black canvas so they can go through OCR in one call.
+
+    Args:
+        images (list): PIL images or numpy arrays with the same number of channels.
+        gap (int): Blank rows between regions, so text from neighbouring regions isn't merged into one line.
+
+    Returns:
+        tuple: The mosaic array and the y offset of each region within it.
+    """
+    arrays = [np.asarray(img) for img in images]
+    width = max(array.shape[1] for array in arrays)
+    height = sum(array.shape[0] for array in arrays) + gap * (len(arrays) - 1)
+
+    mosaic = np.zeros((height, width) + arrays[0].shape[2:], dtype=arrays[0].dtype)
+    y_offsets = []
+    y = 0
+    for array in arrays:
+        mosaic[y:y + array.shape[0], :array.shape[1]] = array
+        y_offsets.append(y)
+        y += array.shape[0] + gap
+
+    return mosaic, y_offsets
+
+
+def split_results(results: list, y_offsets: list[int], heights: list[int]) -> list[list]:
+    """
+    Assign OCR results on a mosaic back to the region containing each bbox's vertical center,
+    translating bboxes into that region's coordinates.
+
+    results are (bbox, text, confidence) with bbox = [x1, y1, x2, y2].
+    """
+    per_region = [[] for _ in y_offsets]
+    for bbox, text, confidence in results:
+        center = (bbox[1] + bbox[3]) / 2
+        for i, (y_offset, height) in enumerate(zip(y_offsets, heights)):
+            if y_offset <= center < y_offset + height:
+                region_bbox = [bbox[0], bbox[1] - y_offset, bbox[2], bbox[3] - y_offset]
+                per_region[i].append((region_bbox, text, confidence))
+                break
+
+    return per_region
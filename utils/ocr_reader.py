@@ -0,0 +1,90 @@
+import threading
+import time
+
+
+class BackgroundReader:
+    """
+    Loads an easyocr.Reader on a background thread and warms it up with a dummy inference,
+    so the first real capture doesn't pay for model load or kernel setup.
+
+    torch/easyocr are only imported on the loader thread. If given, prepare(reader) runs there too,
+    after the model is loaded and before the warm-up. `timings` records the seconds spent importing,
+    loading the model, preparing and warming up.
+    """
+    def __init__(self, languages: list[str], on_ready=None, prepare=None, **reader_kwargs):
+        self.languages = languages
+        self.reader_kwargs = reader_kwargs
+        self.on_ready = on_ready
+        self.prepare = prepare
+        self.timings = {}
+        self.error = None
+        self._ready = threading.Event()
+        self._reader = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name='easyocr-loader', daemon=True)
+                self._thread.start()
+        return self
+
+    def wait(self, timeout=None) -> bool:
+        """
+        Block until the reader is loaded (or failed to load). Returns False on timeout.
+        """
+        self.start()
+        return self._ready.wait(timeout)
+
+    def get(self, timeout=None):
+        """
+        Return the loaded reader, starting the load if needed and waiting for it.
+        """
+        if not self.wait(timeout):
+            raise TimeoutError("EasyOCR reader is still loading")
+        if self.error:
+            raise RuntimeError("EasyOCR reader failed to load") from self.error
+        return self._reader
+
+    def _load(self):
+        try:
+            start = time.perf_counter()
+            import easyocr
+            self.timings['ocr imports'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            reader = easyocr.Reader(self.languages, **self.reader_kwargs)
+            self.timings['model load'] = time.perf_counter() - start
+
+            if self.prepare:
+                start = time.perf_counter()
+                self.prepare(reader)
+                self.timings['prepare'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self._warm_up(reader)
+            self.timings['warm-up'] = time.perf_counter() - start
+
+            self._reader = reader
+        except Exception as e:
+            self.error = e
+            print(f"Error loading EasyOCR: {e}")
+        finally:
+            self._ready.set()
+
+        if self.on_ready and not self.error:
+            self.on_ready(self)
+
+    @staticmethod
+    def _warm_up(reader):
+        import numpy as np
+
+        # run the detector and the recognizer once each on blank input
+        blank = np.zeros((64, 256, 3), dtype=np.uint8)
+        reader.detect(blank)
+        reader.recognize(blank[:32, :, 0])
@@ -0,0 +1,199 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+import numpy as np
+from PIL import Image
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    image_id TEXT PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    text TEXT NOT NULL,
+    results TEXT NOT NULL,
+    image_path TEXT,
+    image_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS captures_timestamp ON captures (timestamp);
+DROP INDEX IF EXISTS captures_text;
+"""
+
+
+class OCRStore:
+    """
+    Saves captures and their OCR results from one background writer thread.
+
+    Records go to saved_data/ocr_data.sqlite (indexed by image_id and timestamp) and images to
+    saved_data/images. The writer queue is bounded: submit() waits up to block_timeout for room and
+    then drops the capture, so a slow disk slows saving down instead of piling up images in memory.
+
+    Args:
+        save_dir (str): Directory for the database and images.
+        image_format (str): 'png' (lossless, default), 'webp' or 'jpeg', or None to not store images.
+        image_quality (int): Quality for lossy formats.
+        crop_to_text (bool): Store only the area around the detected text. Stored bboxes are
+            relative to the stored image.
+        max_records (int): Oldest captures are deleted beyond this many records.
+        max_image_megabytes (float): Oldest captures are deleted beyond this much image data.
+    """
+    def __init__(self, save_dir='saved_data', max_queue=8, block_timeout=0.5, image_format='png', image_quality=85,
+                 crop_to_text=False, crop_margin=16, max_records=10000, max_image_megabytes=1024):
+        self.save_dir = save_dir
+        self.image_dir = os.path.join(save_dir, 'images')
+        self.db_path = os.path.join(save_dir, 'ocr_data.sqlite')
+        self.block_timeout = block_timeout
+        self.image_format = image_format
+        self.image_quality = image_quality
+        self.crop_to_text = crop_to_text
+        self.crop_margin = crop_margin
+        self.max_records = max_records
+        self.max_image_bytes = int(max_image_megabytes * 1024 * 1024)
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self.dropped = 0
+        self._count = self._bytes = 0 # running totals of the table, kept by the writer
+
+    def submit(self, image, ocr_results) -> bool:
+        """
+        Queue a capture for saving. Returns False if it was dropped because the writer is behind.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name='ocr-store-writer', daemon=True)
+            self._thread.start()
+
+        try:
+            self._queue.put((time.time(), image, ocr_results), timeout=self.block_timeout)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            print(f"OCR store is behind, dropped a capture ({self.dropped} so far)")
+            return False
+
+    def close(self):
+        """
+        Wait for queued captures to be written.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(self.save_dir, exist_ok=True)
+        connection = sqlite3.connect(self.db_path)
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _writer(self):
+        connection = self._connect()
+        self._count, self._bytes = connection.execute("SELECT COUNT(*), COALESCE(SUM(image_bytes), 0) FROM captures").fetchone()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write(connection, *item)
+                self._enforce_retention(connection)
+                connection.commit()
+            except Exception as e:
+                print(f"Error saving OCR data: {e}")
+        connection.close()
+
+    def _write(self, connection, timestamp, image, ocr_results):
+        image_id = str(uuid.uuid4())
+        image = Image.fromarray(image) if isinstance(image, np.ndarray) else image
+
+        offset_x = offset_y = 0
+        if self.crop_to_text and ocr_results:
+            offset_x = max(0, min(int(bbox[0]) for bbox, _, _ in ocr_results) - self.crop_margin)
+            offset_y = max(0, min(int(bbox[1]) for bbox, _, _ in ocr_results) - self.crop_margin)
+            right = min(image.width, max(int(bbox[2]) for bbox, _, _ in ocr_results) + self.crop_margin)
+            bottom = min(image.height, max(int(bbox[3]) for bbox, _, _ in ocr_results) + self.crop_margin)
+            image = image.crop((offset_x, offset_y, right, bottom))
+
+        results = [{
+            'bbox': [int(bbox[0]) - offset_x, int(bbox[1]) - offset_y, int(bbox[2]) - offset_x, int(bbox[3]) - offset_y],
+            'text': text,
+            'confidence': float(confidence)
+        } for bbox, text, confidence in ocr_results]
+
+        image_path, image_bytes = None, 0
+        if self.image_format:
+            os.makedirs(self.image_dir, exist_ok=True)
+            image_path = os.path.join(self.image_dir, f"{image_id}.{self.image_format}")
+            if self.image_format == 'png':
+                image.save(image_path, optimize=False, compress_level=1)
+            else:
+                image.convert('RGB').save(image_path, quality=self.image_quality)
+            image_bytes = os.path.getsize(image_path)
+
+        connection.execute(
+            "INSERT INTO captures (image_id, timestamp, text, results, image_path, image_bytes) VALUES (?, ?, ?, ?, ?, ?)",
+            (image_id, timestamp, '\n'.join(r['text'] for r in results), json.dumps(results, ensure_ascii=False),
+             image_path, image_bytes))
+        self._count += 1
+        self._bytes += image_bytes
+
+    def _enforce_retention(self, connection):
+        if self._count <= self.max_records and self._bytes <= self.max_image_bytes:
+            return
+
+        # walk the oldest rows through the timestamp index only as far as needed
+        image_paths = []
+        cursor = connection.execute("SELECT image_path, image_bytes FROM captures ORDER BY timestamp")
+        for image_path, image_bytes in cursor:
+            if self._count <= self.max_records and self._bytes <= self.max_image_bytes:
+                break
+            image_paths.append(image_path)
+            self._count -= 1
+            self._bytes -= image_bytes
+        cursor.close()
+
+        connection.execute("DELETE FROM captures WHERE image_id IN (SELECT image_id FROM captures ORDER BY timestamp LIMIT ?)",
+                           (len(image_paths),))
+        for image_path in image_paths:
+            if image_path and os.path.exists(image_path):
+                os.remove(image_path)
+
+    def query(self, text=None, since=None, limit=100) -> list[dict]:
+        """
+        Return the most recent saved captures, optionally containing `text` or newer than `since`.
+        """
+        return query_captures(self.save_dir, text, since, limit)
+
+
+def query_captures(save_dir: str, text=None, since=None, limit=None) -> list[dict]:
+    """
+    Read saved captures from save_dir, newest first. Each record has image_id, timestamp, text,
+    results [{bbox, text, confidence}] and image_path.
+    """
+    db_path = os.path.join(save_dir, 'ocr_data.sqlite')
+    if not os.path.exists(db_path):
+        return []
+
+    sql = "SELECT image_id, timestamp, text, results, image_path FROM captures WHERE 1 = 1"
+    params = []
+    if text:
+        sql += " AND text LIKE ?"
+        params.append(f"%{text}%")
+    if since:
+        sql += " AND timestamp >= ?"
+        params.append(since)
+    sql += " ORDER BY timestamp DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    connection = sqlite3.connect(db_path)
+    try:
+        rows = connection.execute(sql, params).fetchall()
+    finally:
+        connection.close()
+
+    return [{'image_id': image_id, 'timestamp': timestamp, 'text': text, 'results': json.loads(results), 'image_path': image_path}
+            for image_id, timestamp, text, results, image_path in rows]
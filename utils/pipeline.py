@@ -0,0 +1,104 @@
+import queue
+import threading
+from tkinter import Tk
+
+
+class CapturePipeline:
+    """
+    Runs captures as three stages so hotkey callbacks never block or touch Tk:
+
+        capture (Tk thread) -> inference (single worker thread) -> render (Tk thread)
+
+    Every submit() starts a new generation. Work belonging to an older generation is dropped at the
+    next stage boundary, so under rapid input only the latest capture is OCR'd and rendered.
+
+    Args:
+        root (Tk): The overlay root. Tk calls are marshalled onto its loop by polling with after().
+        capture: (*args, **kwargs) -> payload. Runs on the Tk thread.
+        process: (payload, is_current) -> result. Runs on the inference worker; is_current() returns
+            False once the job has been superseded, so long jobs can bail out early.
+        render: (payload, result) -> None. Runs on the Tk thread, only for the latest job.
+    """
+    def __init__(self, root: Tk, capture, process, render, poll_ms=15):
+        self.root = root
+        self.capture = capture
+        self.process = process
+        self.render = render
+        self.poll_ms = poll_ms
+
+        self._ui_calls = queue.Queue()
+        self._generation = 0
+        self._pending = None # (generation, payload) waiting for the worker
+        self._condition = threading.Condition()
+
+        threading.Thread(target=self._inference_worker, name='ocr-inference', daemon=True).start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def call_soon(self, fn, *args, **kwargs):
+        """
+        Run fn on the Tk thread. Safe to call from any thread.
+        """
+        self._ui_calls.put((fn, args, kwargs))
+
+    def submit(self, *args, **kwargs):
+        """
+        Start a new capture, superseding any capture still in flight. Safe to call from any thread.
+        """
+        generation = self.cancel()
+        self.call_soon(self._capture_stage, generation, args, kwargs)
+
+    def cancel(self) -> int:
+        """
+        Supersede the job in flight without starting a new one. Returns the new generation.
+        """
+        with self._condition:
+            self._generation += 1
+            self._pending = None
+            return self._generation
+
+    def is_current(self, generation: int) -> bool:
+        return generation == self._generation
+
+    def _capture_stage(self, generation, args, kwargs):
+        if not self.is_current(generation):
+            return
+        payload = self.capture(*args, **kwargs)
+
+        with self._condition:
+            if self.is_current(generation):
+                self._pending = (generation, payload)
+                self._condition.notify()
+
+    def _inference_worker(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                generation, payload = self._pending
+                self._pending = None
+
+            try:
+                result = self.process(payload, lambda: self.is_current(generation))
+            except Exception as e:
+                print(f"Error processing capture: {e}")
+                continue
+
+            if self.is_current(generation):
+                self.call_soon(self._render_stage, generation, payload, result)
+
+    def _render_stage(self, generation, payload, result):
+        if self.is_current(generation):
+            self.render(payload, result)
+
+    def _poll(self):
+        while True:
+            try:
+                fn, args, kwargs = self._ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                print(f"Error: {e}")
+
+        self.root.after(self.poll_ms, self._poll)
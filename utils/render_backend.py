@@ -0,0 +1,306 @@
+from collections import deque
+from tkinter import Button, Canvas, Frame, Label, TclError, Tk, Toplevel
+
+
+class RenderBackend:
+    """
+    What the vocab overlay (utils/vocab.py) needs from a windowing toolkit.
+
+    An overlay is the surface for one capture's cards; card windows are built once per word by
+    CardPool and then shown, hidden and finally destroyed. Handles returned by the backend are
+    opaque to the callers.
+    """
+    def create_overlay(self, on_destroy):
+        """
+        Create the overlay surface. on_destroy() is called if something else destroys it.
+        """
+        raise NotImplementedError
+
+    def destroy_overlay(self, overlay):
+        raise NotImplementedError
+
+    def clear_overlays(self):
+        """
+        Destroy every overlay, as a new capture does.
+        """
+        raise NotImplementedError
+
+    def schedule(self, ms: int, callback):
+        """
+        Call callback once after ms milliseconds on the UI thread. Returns an id for cancel().
+        """
+        raise NotImplementedError
+
+    def cancel(self, schedule_id):
+        raise NotImplementedError
+
+    def pointer(self) -> tuple[int, int]:
+        raise NotImplementedError
+
+    def build_card(self, vocab_card) -> tuple[object, int, int]:
+        """
+        Build the hidden card window for vocab_card. Returns (window, width, height).
+        """
+        raise NotImplementedError
+
+    def show_card(self, window, x: int, y: int, width: int, height: int, added: bool, on_add):
+        raise NotImplementedError
+
+    def mark_added(self, window):
+        """
+        Show the card's Anki button as done.
+        """
+        raise NotImplementedError
+
+    def hide_card(self, window):
+        raise NotImplementedError
+
+    def destroy_card(self, window):
+        raise NotImplementedError
+
+    def card_rect(self, window) -> tuple[int, int, int, int]:
+        """
+        Return the card window's [x1, y1, x2, y2] on screen.
+        """
+        raise NotImplementedError
+
+    def flush(self, window):
+        """
+        Finish drawing the window now (for timing how long a card takes to appear).
+        """
+
+    def counts(self) -> dict:
+        """
+        Return the number of live overlays, windows, widgets and scheduled callbacks, for leak checks.
+        """
+        raise NotImplementedError
+
+
+class TkBackend(RenderBackend):
+    """
+    Renders into the fullscreen transparent Tk root: overlays are Canvases packed into it and
+    cards are borderless topmost Toplevels.
+    """
+    def __init__(self, root: Tk):
+        self.root = root
+
+    def create_overlay(self, on_destroy):
+        canvas = Canvas(self.root, bg='white', bd=0, highlightthickness=0)
+        canvas.pack(fill='both', expand=True)
+        # clear_canvases destroys Canvas children of root directly
+        canvas.bind('<Destroy>', lambda event: on_destroy())
+        return canvas
+
+    def destroy_overlay(self, overlay: Canvas):
+        try:
+            overlay.destroy()
+        except TclError:
+            pass # already destroyed
+
+    def clear_overlays(self):
+        for widget in self.root.winfo_children():
+            if isinstance(widget, Canvas):
+                widget.destroy()
+
+    def schedule(self, ms: int, callback):
+        return self.root.after(ms, callback)
+
+    def cancel(self, schedule_id):
+        self.root.after_cancel(schedule_id)
+
+    def pointer(self) -> tuple[int, int]:
+        return self.root.winfo_pointerxy()
+
+    def build_card(self, vocab_card) -> tuple[Toplevel, int, int]:
+        card = Toplevel(self.root)
+        card.attributes('-alpha', 1)
+        card.config(bg=vocab_card.bg)
+        card.overrideredirect(True)
+        card.wm_attributes("-topmost", True)
+
+        for i, traditional in enumerate(vocab_card.entries):
+            title = Label(card, text=f"{vocab_card.simplified} | {traditional}", bg=vocab_card.bg, font=('Arial', 16), justify='left', anchor='w', padx=8)
+            title.pack(fill='both', expand=True)
+
+            pinyin_list = vocab_card.entries[traditional]
+            for j, pinyin in enumerate(pinyin_list):
+                english_list = pinyin_list[pinyin]
+                if len(english_list) > 1:
+                    # enumerate english
+                    english = '\n'.join([f"{i}. {e}" for i, e in enumerate(english_list, 1)])
+                else:
+                    english = english_list[0]
+                # label = Label(card, text=f"{english}\n\n{pinyin}", bg='#ffffd7', font=('Arial', 14), justify='left', anchor='w', padx=8, wraplength=500)
+                english_label = Label(card, text=f"{english}", bg=vocab_card.bg, font=('Arial', 14), justify='left', anchor='w', padx=8, wraplength=500)
+                english_label.pack(fill='both', expand=True)
+
+                pinyin_label = Label(card, text=f"{pinyin}", bg=vocab_card.bg, fg='red', font=('Arial', 14), justify='left', anchor='w', padx=8)
+                pinyin_label.pack(fill='both', expand=True)
+
+                if not vocab_card.is_single_entry:
+                    english_label.config(font=('Arial', 12))
+                    pinyin_label.config(font=('Arial', 12))
+
+                if j < len(pinyin_list) - 1:
+                    # Add a dividing line
+                    line = Frame(card, height=1, bg='black')
+                    line.pack(fill='x', padx=5, pady=5)
+
+                english_label.pack(fill='both', expand=True)
+                pinyin_label.pack(fill='both', expand=True)
+
+            if i < len(vocab_card.entries) - 1:
+                # Add a divider between traditionals
+                divider = Frame(card, height=2, bg='black')
+                divider.pack(fill='x', padx=5, pady=5)
+
+        card.update_idletasks()
+
+        padding = 25
+        width = card.winfo_reqwidth() + padding
+        height = card.winfo_reqheight()
+
+        # Create and pack the button at the bottom right
+        card.anki_button = Button(card, cursor='hand2', text="+", bg='gray', fg='black', font=('Arial', 10), width=2, height=1)
+        card.anki_button.place(relx=1, rely=1, x=-5, y=-5, anchor='se')
+
+        card.withdraw()
+        return card, width, height
+
+    def show_card(self, window: Toplevel, x: int, y: int, width: int, height: int, added: bool, on_add):
+        window.geometry(f"{width}x{height}+{x}+{y}")
+
+        window.anki_button.config(command=on_add)
+        if added:
+            self.mark_added(window)
+        else:
+            window.anki_button.config(text="+", bg='gray', fg='black', cursor='hand2', state='normal')
+
+        window.deiconify()
+        window.lift()
+
+    def mark_added(self, window: Toplevel):
+        window.anki_button.config(text='✓', bg='#90EE90', fg='white', cursor='arrow', state='disabled')
+
+    def hide_card(self, window: Toplevel):
+        window.withdraw()
+
+    def destroy_card(self, window: Toplevel):
+        window.destroy()
+
+    def card_rect(self, window: Toplevel) -> tuple[int, int, int, int]:
+        x, y = window.winfo_rootx(), window.winfo_rooty()
+        return x, y, x + window.winfo_width(), y + window.winfo_height()
+
+    def flush(self, window: Toplevel):
+        window.update_idletasks()
+
+    def counts(self) -> dict:
+        widgets = list(self.root.winfo_children())
+        for widget in widgets:
+            widgets.extend(widget.winfo_children())
+        return {
+            'overlays': sum(isinstance(widget, Canvas) for widget in self.root.winfo_children()),
+            'windows': sum(isinstance(widget, Toplevel) for widget in widgets),
+            'widgets': len(widgets),
+            'scheduled': len(self.root.tk.splitlist(self.root.tk.call('after', 'info'))),
+        }
+
+
+class RecordedWindow:
+    def __init__(self, simplified: str, width: int, height: int):
+        self.simplified = simplified
+        self.width = width
+        self.height = height
+        self.x = self.y = 0
+        self.visible = False
+        self.added = False
+        self.on_add = None
+
+
+class RecordingBackend(RenderBackend):
+    """
+    Headless backend that keeps the state a real toolkit would, without drawing anything.
+
+    The pointer is set by the caller, scheduled callbacks run when run_scheduled() is called, and
+    the most recent operations are kept in `events` (bounded, so recording itself doesn't grow).
+    """
+    def __init__(self, max_events=1000):
+        self.events = deque(maxlen=max_events)
+        self.position = (0, 0)
+        self._overlays = {} # id -> on_destroy
+        self._windows = set()
+        self._scheduled = {} # id -> callback
+        self._next_id = 0
+
+    def _id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def create_overlay(self, on_destroy):
+        overlay = self._id()
+        self._overlays[overlay] = on_destroy
+        self.events.append(('create_overlay', overlay))
+        return overlay
+
+    def destroy_overlay(self, overlay):
+        if self._overlays.pop(overlay, None) is not None:
+            self.events.append(('destroy_overlay', overlay))
+
+    def clear_overlays(self):
+        for overlay, on_destroy in list(self._overlays.items()):
+            self.destroy_overlay(overlay)
+            on_destroy()
+
+    def schedule(self, ms: int, callback):
+        schedule_id = self._id()
+        self._scheduled[schedule_id] = callback
+        return schedule_id
+
+    def cancel(self, schedule_id):
+        self._scheduled.pop(schedule_id, None)
+
+    def run_scheduled(self):
+        """
+        Run the callbacks scheduled so far, as if their delay had passed.
+        """
+        scheduled, self._scheduled = self._scheduled, {}
+        for callback in scheduled.values():
+            callback()
+
+    def pointer(self) -> tuple[int, int]:
+        return self.position
+
+    def build_card(self, vocab_card) -> tuple[RecordedWindow, int, int]:
+        lines = sum(1 + 2 * len(pinyin_list) for pinyin_list in vocab_card.entries.values())
+        window = RecordedWindow(vocab_card.simplified, 400, 24 * lines)
+        self._windows.add(window)
+        self.events.append(('build_card', vocab_card.simplified))
+        return window, window.width, window.height
+
+    def show_card(self, window: RecordedWindow, x: int, y: int, width: int, height: int, added: bool, on_add):
+        window.x, window.y, window.visible, window.added, window.on_add = x, y, True, added, on_add
+        self.events.append(('show_card', window.simplified))
+
+    def mark_added(self, window: RecordedWindow):
+        window.added = True
+
+    def hide_card(self, window: RecordedWindow):
+        window.visible = False
+        self.events.append(('hide_card', window.simplified))
+
+    def destroy_card(self, window: RecordedWindow):
+        self._windows.discard(window)
+        window.on_add = None
+        self.events.append(('destroy_card', window.simplified))
+
+    def card_rect(self, window: RecordedWindow) -> tuple[int, int, int, int]:
+        return window.x, window.y, window.x + window.width, window.y + window.height
+
+    def counts(self) -> dict:
+        return {
+            'overlays': len(self._overlays),
+            'windows': len(self._windows),
+            'widgets': len(self._overlays) + len(self._windows),
+            'scheduled': len(self._scheduled),
+        }
@@ -0,0 +1,34 @@
+import numpy as np
+
+
+def estimate_text_height(mask: np.ndarray, min_height=3):
+    """
+    Estimate the character height in px of the text in a boolean text mask, or None if there is too
+    little text to tell.
+
+    Chinese characters are made of several strokes, so most connected components are parts of
+    characters. The tallest components are whole characters (or their full-height strokes), so the
+    median of the top quarter of component heights is taken as the character height. Components
+    taller than a quarter of the mask (panels or borders in a text color) are ignored.
+    """
+    import cv2
+
+    _, _, stats, _ = cv2.connectedComponentsWithStats(mask.astype(np.uint8), connectivity=8)
+    heights = stats[1:, cv2.CC_STAT_HEIGHT] # label 0 is the background
+    heights = np.sort(heights[(heights >= min_height) & (heights <= mask.shape[0] // 4)])
+    if len(heights) < 4:
+        return None
+    return float(np.median(heights[-max(4, len(heights) // 4):]))
+
+
+def choose_scale(text_height, target_height=32, min_scale=0.25, step=0.125) -> float:
+    """
+    Return the downscale factor (<= 1) that brings text_height closest to target_height.
+
+    Scales are rounded up to a multiple of step, so small changes in the estimate between captures
+    don't change the input size, and never go below min_scale. Text that is already small is left as is.
+    """
+    if not text_height or text_height <= target_height:
+        return 1.0
+    scale = np.ceil(target_height / text_height / step) * step
+    return float(min(1.0, max(min_scale, scale)))
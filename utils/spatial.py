@@ -0,0 +1,28 @@
+class GridIndex:
+    """
+    Uniform grid over screen space for point-in-box lookups.
+
+    Each box is registered in every cell it overlaps, so a lookup only checks the few boxes in the
+    pointer's cell, however many boxes there are on screen.
+    """
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self._cells = {} # (column, row) -> [(bbox, item)]
+
+    def insert(self, bbox: list[int], item):
+        x1, y1, x2, y2 = bbox
+        for column in range(x1 // self.cell_size, x2 // self.cell_size + 1):
+            for row in range(y1 // self.cell_size, y2 // self.cell_size + 1):
+                self._cells.setdefault((column, row), []).append((bbox, item))
+
+    def query_point(self, x: int, y: int):
+        """
+        Return the item of the most recently inserted box containing (x, y), or None.
+        """
+        for (x1, y1, x2, y2), item in reversed(self._cells.get((x // self.cell_size, y // self.cell_size), ())):
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                return item
+        return None
+
+    def clear(self):
+        self._cells.clear()
@@ -0,0 +1,70 @@
+import numpy as np
+
+from utils.layout_cache import ink_bands
+
+
+def text_tiles(mask: np.ndarray, margin=16, min_height=4, column_gap=4.0) -> list[list[int]]:
+    """
+    Find the areas of a boolean text mask worth OCR'ing, as [x1, y1, x2, y2] tiles.
+
+    Rows of text come from the mask's row projection (see ink_bands). Each band is split where its
+    columns have an empty gap wider than column_gap times the band height (text at opposite edges of
+    the screen), padded by margin px and clipped to the mask. Bands shorter than min_height px are
+    specks, not text, and are dropped. Tiles that overlap after padding are merged.
+    """
+    height, width = mask.shape
+    tiles = []
+    for y1, y2, _, _ in ink_bands(mask):
+        if y2 - y1 < min_height:
+            continue
+
+        columns = np.flatnonzero(mask[y1:y2].any(axis=0))
+        breaks = np.flatnonzero(np.diff(columns) > column_gap * (y2 - y1))
+        starts = np.concatenate(([columns[0]], columns[breaks + 1]))
+        ends = np.concatenate((columns[breaks], [columns[-1]])) + 1
+        for x1, x2 in zip(starts, ends):
+            tiles.append([max(0, int(x1) - margin), max(0, y1 - margin), min(width, int(x2) + margin), min(height, y2 + margin)])
+
+    return _merge_overlapping(tiles)
+
+
+def _merge_overlapping(tiles: list[list[int]]) -> list[list[int]]:
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(tiles)):
+            for j in range(i + 1, len(tiles)):
+                a, b = tiles[i], tiles[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    tiles[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del tiles[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return tiles
+
+
+def iou(a: list, b: list) -> float:
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    intersection = max(0, x2 - x1) * max(0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def merge_tile_results(per_tile: list[list], tiles: list[list[int]], iou_threshold=0.5) -> list:
+    """
+    Translate each tile's OCR results into full image coordinates and drop duplicate lines
+    (lines read from two tiles whose boxes overlap by more than iou_threshold), keeping the more
+    confident reading. Results are returned in reading order, top to bottom then left to right.
+    """
+    results = [([bbox[0] + x1, bbox[1] + y1, bbox[2] + x1, bbox[3] + y1], text, confidence)
+               for tile_results, (x1, y1, _, _) in zip(per_tile, tiles)
+               for bbox, text, confidence in tile_results]
+
+    kept = []
+    for result in sorted(results, key=lambda result: -result[2]):
+        if all(iou(result[0], other[0]) <= iou_threshold for other in kept):
+            kept.append(result)
+    return sorted(kept, key=lambda result: (result[0][1], result[0][0]))
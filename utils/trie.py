@@ -0,0 +1,47 @@
+class VocabTrie:
+    """
+    Prefix index over dictionary keys, used for longest-match vocab lookup.
+
+    Each node is a dict of {character: child node}. A node that ends a word stores
+    the word under the END key, so a match can be returned without rebuilding strings.
+    """
+    END = ''
+
+    def __init__(self, words=()):
+        self.root = {}
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word: str):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[self.END] = word
+
+    def __contains__(self, word: str) -> bool:
+        node = self.root
+        for char in word:
+            node = node.get(char)
+            if node is None:
+                return False
+        return self.END in node
+
+    def longest_match(self, text: str, start: int = 0):
+        """
+        Return the longest word in the trie that starts at text[start], or None.
+        Walks past prefixes that are not words themselves.
+        """
+        node = self.root
+        match = None
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            match = node.get(self.END, match)
+        return match
+
+    def longest_matches(self, text: str) -> list:
+        """
+        Return a list of len(text) with the longest word starting at each position (or None).
+        """
+        return [self.longest_match(text, i) for i in range(len(text))]
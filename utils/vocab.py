@@ -1,179 +1,196 @@
-import threading
-from tkinter import Button, Canvas, Tk, Toplevel, Label, Frame
-from utils.anki import add_vocabulary_to_anki, build_vocab_entry_from_VocabCard
-import json
-
-class VocabCanvas(Canvas):
-    def __init__(self, root: Tk):
-        super().__init__(root)
-        self.config(bg='white', bd=0, highlightthickness=0)
-        self.pack(fill='both', expand=True)
-        self.root = root
+import time
+from utils.anki import AnkiClient, build_vocab_entry_from_VocabCard
+from utils.metrics import METRICS
+from utils.render_backend import RenderBackend
+from utils.spatial import GridIndex
+from collections import OrderedDict
+
+class VocabCanvas:
+    """
+    Overlay for one capture's vocab cards.
+
+    Instead of a hover window per word, the pointer position is polled and looked up in a grid index
+    of the word bboxes, so only the card being shown has a window of its own. Drawing goes through
+    a RenderBackend (see utils/render_backend.py).
+    """
+    POLL_MS = 30
+
+    def __init__(self, backend: RenderBackend, anki: AnkiClient, pool: 'CardPool'):
+        self.backend = backend
+        self.anki = anki
+        self.pool = pool
         self.vocab_cards: list[VocabCard] = []
+        self.index = GridIndex()
+        self.focused = None
+        self.destroyed = False
+        self.overlay = backend.create_overlay(on_destroy=self.destroy)
+        self._poll_id = backend.schedule(self.POLL_MS, self.track_pointer)
     
     def add_vocab_card(self, vocab: str, bbox: list[int], dictionary_entry):
+        if self.anki.known_words == 'skip' and self.anki.is_known(vocab):
+            return
         card = VocabCard(self, vocab, bbox, dictionary_entry)
         self.vocab_cards.append(card)
+        self.index.insert(bbox, card)
+
+    def track_pointer(self):
+        x, y = self.backend.pointer()
+        if not (self.focused and self.focused.contains_on_card(x, y)):
+            self.shift_focus(self.index.query_point(x, y))
+        self._poll_id = self.backend.schedule(self.POLL_MS, self.track_pointer)
     
     def shift_focus(self, new_focus):
-        for card in self.vocab_cards:
-            if card == new_focus:
-                card.construct_GUI()
-            else:
-                card.remove_GUI()
+        if new_focus is self.focused:
+            return
+        if self.focused:
+            self.focused.remove_GUI()
+        self.focused = new_focus
+        if new_focus:
+            start = time.perf_counter()
+            new_focus.construct_GUI()
+            if new_focus.card:
+                self.backend.flush(new_focus.card)
+                METRICS.record('hover to card', time.perf_counter() - start)
     
     def destroy(self):
+        if self.destroyed:
+            return
+        self.destroyed = True
+        self.backend.cancel(self._poll_id)
         for card in self.vocab_cards:
             card.destroy()
-        super().destroy()
+        self.vocab_cards.clear()
+        self.index.clear()
+        self.focused = None
+        self.backend.destroy_overlay(self.overlay)
 
 class VocabCard:
     def __init__(self, parent: VocabCanvas, vocab: str, bbox: list[int], dictionary_entry):
         self.parent = parent
         self.simplified = vocab
 
-        traditional_list = [entry[0] for entry in dictionary_entry]
-        pinyin_list = [entry[1] for entry in dictionary_entry]
-        english_list = [entry[2] for entry in dictionary_entry]
-
-        def format_entries(pinyin_list, english_list):
-            entries = {}
-            for traditional, pinyin, english in zip(traditional_list, pinyin_list, english_list):
-                if traditional in entries:
-                    if pinyin in entries[traditional]:
-                        entries[traditional][pinyin].append(english)
-                    else:
-                        entries[traditional][pinyin] = [english]
-                else:
-                    entries[traditional] = {pinyin: [english]}
-                    
-            return entries
-        
-        self.entries = format_entries(pinyin_list, english_list) # {traditional: {pinyin: [english]}}
-        self.is_single_entry = len(traditional_list) == 1 and len(pinyin_list) == 1 and len(english_list) == 1
+        self.entries, self.is_single_entry = parent.pool.entries(vocab, dictionary_entry) # {traditional: {pinyin: [english]}}
 
         self.bbox = bbox
         self.card = None
-        self.hoverbox = None
-        self.initiate_hoverbox()
-        self.added_to_anki = False
+        self.added_to_anki = parent.anki.is_known(vocab)
+        # cards of words already in the Anki deck are drawn muted
+        self.bg = '#e4e4e4' if self.added_to_anki and parent.anki.known_words == 'dim' else '#ffffd7'
         
-    def initiate_hoverbox(self):
-        self.hoverbox = Toplevel(self.parent)
-        self.hoverbox.attributes('-alpha', 0.01)
-        self.hoverbox.wm_attributes("-topmost", True)
-        self.hoverbox.overrideredirect(True)
-
-        self.hoverbox.update_idletasks()
-        self.hoverbox.geometry(f"{self.bbox[2] - self.bbox[0]}x{self.bbox[3] - self.bbox[1]}+{self.bbox[0]}+{self.bbox[1]}")
-
-        self.hoverbox.bind('<Enter>', self.update_card_visibility)
-        self.hoverbox.bind('<Leave>', self.update_card_visibility)
-    
-    def update_card_visibility(self, event):
-        x, y = event.x_root, event.y_root
-        mouse_on_hoverbox = self.bbox[0] <= x <= self.bbox[2] and self.bbox[1] <= y <= self.bbox[3]
-        mouse_on_card = self.card and \
-            self.card.winfo_rootx() <= x <= (self.card.winfo_rootx() + self.card.winfo_width()) and \
-                self.card.winfo_rooty() <= y <= (self.card.winfo_rooty() + self.card.winfo_height())
-        is_focused = mouse_on_hoverbox or mouse_on_card
-
-        if is_focused:
-            self.parent.shift_focus(self)
-        else:
-            self.remove_GUI()
+    def contains_on_card(self, x: int, y: int) -> bool:
+        """
+        Whether the screen point is on this word's bbox or on its open card.
+        """
+        if self.bbox[0] <= x <= self.bbox[2] and self.bbox[1] <= y <= self.bbox[3]:
+            return True
+        if not self.card:
+            return False
+        x1, y1, x2, y2 = self.parent.backend.card_rect(self.card)
+        return x1 <= x <= x2 and y1 <= y <= y2
 
     def construct_GUI(self):
         if self.card:
             return # already constructed
         
         try:
-            self.card = Toplevel(self.parent)
-            self.card.attributes('-alpha', 1)
-            self.card.config(bg='#ffffd7')
-            self.card.overrideredirect(True)
-            self.card.wm_attributes("-topmost", True)
-
-            for i, traditional in enumerate(self.entries):
-                title = Label(self.card, text=f"{self.simplified} | {traditional}", bg='#ffffd7', font=('Arial', 16), justify='left', anchor='w', padx=8)
-                title.pack(fill='both', expand=True)
-
-                pinyin_list = self.entries[traditional]
-                for j, pinyin in enumerate(pinyin_list):
-                    english_list = pinyin_list[pinyin]
-                    if len(english_list) > 1:
-                        # enumerate english
-                        english = '\n'.join([f"{i}. {e}" for i, e in enumerate(english_list, 1)])
-                    else:
-                        english = english_list[0]
-                    # label = Label(self.card, text=f"{english}\n\n{pinyin}", bg='#ffffd7', font=('Arial', 14), justify='left', anchor='w', padx=8, wraplength=500)
-                    english_label = Label(self.card, text=f"{english}", bg='#ffffd7', font=('Arial', 14), justify='left', anchor='w', padx=8, wraplength=500)
-                    english_label.pack(fill='both', expand=True)
-
-                    pinyin_label = Label(self.card, text=f"{pinyin}", bg='#ffffd7', fg='red', font=('Arial', 14), justify='left', anchor='w', padx=8)
-                    pinyin_label.pack(fill='both', expand=True)
-
-                    if not self.is_single_entry:
-                        english_label.config(font=('Arial', 12))
-                        pinyin_label.config(font=('Arial', 12))
-
-                    if j < len(pinyin_list) - 1:
-                        # Add a dividing line
-                        line = Frame(self.card, height=1, bg='black')
-                        line.pack(fill='x', padx=5, pady=5)
-
-                    english_label.pack(fill='both', expand=True)
-                    pinyin_label.pack(fill='both', expand=True)
-                
-                if i < len(self.entries) - 1:
-                    # Add a divider between traditionals
-                    divider = Frame(self.card, height=2, bg='black')
-                    divider.pack(fill='x', padx=5, pady=5)  
-            
-            self.card.update_idletasks()
-
-            padding = 25
-            width = self.card.winfo_reqwidth() + padding
-            height = self.card.winfo_reqheight()
-            self.card.geometry(f"{width}x{height}+{self.bbox[0]}+{self.bbox[1] - height}")
-
-            # Create and pack the button at the bottom right
-            self.add_to_anki_button = Button(self.card, cursor='hand2', text="+", bg='gray', fg='black', font=('Arial', 10), width=2, height=1, command=self.add_to_anki)
-            if self.added_to_anki:
-                self.add_to_anki_button.config(text='✓', bg='#90EE90', fg='white', cursor='arrow', state='disabled')
-            self.add_to_anki_button.place(relx=1, rely=1, x=-5, y=-5, anchor='se')
-
-            self.card.bind('<Enter>', self.update_card_visibility)
-            self.card.bind('<Leave>', self.update_card_visibility)
-
+            self.card = self.parent.pool.show(self)
         except Exception as e:
             print(f"Error constructing GUI: {e}")
             self.remove_GUI()
     
     def add_to_anki(self):
-        self.add_to_anki_button.config(text='✓', bg='#90EE90', fg='white', cursor='arrow', state='disabled')
+        if self.card:
+            self.parent.backend.mark_added(self.card)
         self.added_to_anki = True
-
-        def add_to_anki_thread():
-            vocab_entry = build_vocab_entry_from_VocabCard(self)
-            with open('./config.json', 'r') as f:
-                CONFIG = json.load(f)
-            add_vocabulary_to_anki(CONFIG['anki'], vocab_entry)
-    
-        threading.Thread(target=add_to_anki_thread).start()
+        self.parent.anki.add(build_vocab_entry_from_VocabCard(self))
 
     def remove_GUI(self):
         if self.card:
-            self.card.destroy()
+            self.parent.pool.hide(self.card)
             self.card = None
     
     def destroy(self):
         self.remove_GUI()
-        self.hoverbox.destroy()
 
     def __str__(self):
         formatted_entries = '\n'.join([f"{k}: {v}" for k, v in self.entries.items()])
         return f"{self.simplified}\n{formatted_entries}\n{self.bbox}"
     
     def __repr__(self):
-        return f"VocabCard({self.simplified}, {self.bbox})"
\ No newline at end of file
+        return f"VocabCard({self.simplified}, {self.bbox})"
+
+def format_entries(dictionary_entry) -> dict:
+    """
+    Group [(traditional, pinyin, english)] entries into {traditional: {pinyin: [english]}}.
+    """
+    entries = {}
+    for traditional, pinyin, english in dictionary_entry:
+        if traditional in entries:
+            if pinyin in entries[traditional]:
+                entries[traditional][pinyin].append(english)
+            else:
+                entries[traditional][pinyin] = [english]
+        else:
+            entries[traditional] = {pinyin: [english]}
+
+    return entries
+
+class CardPool:
+    """
+    Card windows and grouped entries, kept across captures.
+
+    Grouped entries are cached per simplified word. Each word's card window is built and measured
+    once, then hidden and shown again instead of being rebuilt on every hover. Both caches are
+    bounded LRUs; evicted windows are destroyed.
+    """
+    def __init__(self, backend: RenderBackend, max_windows=64, max_entries=4096):
+        self.backend = backend
+        self.max_windows = max_windows
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # simplified -> (entries, is_single_entry)
+        self._windows = OrderedDict() # (simplified, bg) -> (window, width, height)
+        self.visible = set() # windows currently shown
+
+    def entries(self, vocab: str, dictionary_entry) -> tuple[dict, bool]:
+        if vocab in self._entries:
+            self._entries.move_to_end(vocab)
+            return self._entries[vocab]
+
+        result = (format_entries(dictionary_entry), len(dictionary_entry) == 1)
+        self._entries[vocab] = result
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result
+
+    def show(self, vocab_card: 'VocabCard'):
+        """
+        Show the card window for vocab_card above its bbox. Returns the window.
+        """
+        key = (vocab_card.simplified, vocab_card.bg)
+        if key in self._windows:
+            self._windows.move_to_end(key)
+        else:
+            self._windows[key] = self.backend.build_card(vocab_card)
+            while len(self._windows) > self.max_windows:
+                _, (window, _, _) = self._windows.popitem(last=False)
+                self.visible.discard(window)
+                self.backend.destroy_card(window)
+
+        window, width, height = self._windows[key]
+        self.backend.show_card(window, vocab_card.bbox[0], vocab_card.bbox[1] - height, width, height,
+                               vocab_card.added_to_anki, vocab_card.add_to_anki)
+        self.visible.add(window)
+        return window
+
+    def hide(self, window):
+        self.backend.hide_card(window)
+        self.visible.discard(window)
+
+    def clear(self):
+        for window, _, _ in self._windows.values():
+            self.backend.destroy_card(window)
+        self._windows.clear()
+        self.visible.clear()
+
+    def __len__(self) -> int:
+        return len(self._windows)
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import numpy as np
+
+
+class ChangeGate:
+    """
+    Decides when a sampled region has new content worth OCR'ing.
+
+    Samples are compared as downsampled boolean text masks. A sample differs from another if more
+    than `threshold` of its pixels flipped. The gate opens once the content has changed since the
+    last OCR and then stayed the same for `settle` seconds, so text that is still being typed out
+    or animated in is only OCR'd once it has finished.
+    """
+    def __init__(self, threshold=0.002, settle=0.3):
+        self.threshold = threshold
+        self.settle = settle
+        self._last = None # previous sample
+        self._changed_at = 0.0
+        self._processed = None # sample last handed to OCR
+
+    def differs(self, a: np.ndarray, b: np.ndarray) -> bool:
+        if a is None or b is None or a.shape != b.shape:
+            return True
+        return np.count_nonzero(a != b) > self.threshold * a.size
+
+    def update(self, sample: np.ndarray, now: float) -> tuple[bool, bool]:
+        """
+        Feed a new sample.
+
+        Returns:
+            tuple[bool, bool]: (changed, ready). changed is True if the sample differs from the
+            previous one; ready is True if the settled content should be OCR'd now.
+        """
+        if self.differs(sample, self._last):
+            self._last = sample
+            self._changed_at = now
+            return True, False
+
+        if now - self._changed_at >= self.settle and self.differs(sample, self._processed):
+            self._processed = sample
+            return False, True
+        return False, False
+
+    @property
+    def pending(self) -> bool:
+        """
+        True while there is changed content that hasn't been OCR'd yet.
+        """
+        return self.differs(self._last, self._processed)
+
+    def reset(self):
+        self._last = self._processed = None
+
+
+class Watcher:
+    """
+    Samples a screen region on a background thread and calls on_change when its content has changed
+    and settled.
+
+    The sampling interval starts at `interval` and grows by `backoff` per idle sample up to
+    `max_interval`, dropping back to `interval` as soon as anything changes.
+
+    Args:
+        sample: () -> boolean text mask of the region, or None to skip this sample.
+        on_change: () -> None, called from the watcher thread.
+    """
+    def __init__(self, sample, on_change, interval=0.25, max_interval=2.0, backoff=1.5, settle=0.3, threshold=0.002):
+        self.sample = sample
+        self.on_change = on_change
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.gate = ChangeGate(threshold, settle)
+        self.samples = self.triggers = 0
+        self._stop = None # stop event of the current thread
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.gate.reset()
+        # each thread gets its own stop event, so a thread still finishing a sample after stop()
+        # can't be revived by a quick start()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), name='watch', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+        self._thread = None
+
+    def toggle(self) -> bool:
+        """
+        Start or stop watching. Returns whether it is now running.
+        """
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+        return self.running
+
+    def _run(self, stop: threading.Event):
+        delay = self.interval
+        while not stop.wait(delay):
+            try:
+                sample = self.sample()
+            except Exception as e:
+                print(f"Error sampling watched region: {e}")
+                sample = None
+
+            if stop.is_set():
+                break
+
+            if sample is None:
+                delay = self.interval
+                continue
+            self.samples += 1
+
+            changed, ready = self.gate.update(sample, time.monotonic())
+            if ready:
+                self.triggers += 1
+                self.on_change()
+
+            if changed or self.gate.pending:
+                delay = self.interval
+            else:
+                delay = min(delay * self.backoff, self.max_interval)